@@ -0,0 +1,457 @@
+"""
+Pool of warm, logged-in headless Chrome drivers shared across scrape jobs.
+
+Launching Chrome and logging in to LinkedIn costs 10-30s per job, so drivers
+are kept alive between jobs and leased out per auth identity. Each driver is
+health-checked before reuse and recycled after a number of pages or once its
+JS heap grows past a limit.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    HAS_SELENIUM = True
+except ImportError:
+    HAS_SELENIUM = False
+
+import session_manager
+from config import DATA_DIR, BROWSER_POOL_SIZE, BROWSER_MAX_PAGES, BROWSER_MAX_MEMORY_MB, BLOCK_RESOURCES
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Resource blocking — nothing below is needed by _parse_posts_from_soup
+# ---------------------------------------------------------------------------
+_MEDIA_PATTERNS = [
+    "*media.licdn.com/dms/image*",
+    "*dms.licdn.com/playlist*",
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+]
+
+_TRACKING_PATTERNS = [
+    "*px.ads.linkedin.com*",
+    "*snap.licdn.com*",
+    "*linkedin.com/li/track*",
+    "*linkedin.com/realtime/*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+]
+
+_BLOCK_PROFILES = {
+    "none": [],
+    "media": _MEDIA_PATTERNS,
+    "strict": _MEDIA_PATTERNS + _TRACKING_PATTERNS,
+}
+
+
+def _apply_resource_blocking(browser, profile: str):
+    patterns = _BLOCK_PROFILES.get(profile)
+    if patterns is None:
+        logger.warning(f"Unknown BLOCK_RESOURCES profile '{profile}', nothing blocked")
+        return
+    if not patterns:
+        return
+    browser.execute_cdp_cmd("Network.enable", {})
+    browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+# ---------------------------------------------------------------------------
+# Network accounting
+# ---------------------------------------------------------------------------
+# Chrome's DevTools Network events are read from the performance log after
+# each lease. Transferred bytes are the encodedDataLength of finished
+# requests, which unlike resource timing also covers cross-origin licdn
+# responses without Timing-Allow-Origin. Blocked requests never transfer
+# anything, so their size is estimated from the mean size of loaded
+# responses of the same resource type, kept in DATA_DIR across restarts
+# (run a job with BLOCK_RESOURCES=none to collect samples for images, media
+# and fonts). Images suppressed by the content setting are never requested
+# and are not counted.
+_SIZES_FILE = os.path.join(DATA_DIR, "resource_sizes.json")
+
+
+class _TypicalSizes:
+    """Running mean response size per DevTools resource type."""
+
+    def __init__(self, path: str = _SIZES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._totals: dict[str, tuple[int, int]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._totals = {k: tuple(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+
+    def add(self, resource_type: str, size: int):
+        with self._lock:
+            total, count = self._totals.get(resource_type, (0, 0))
+            self._totals[resource_type] = (total + size, count + 1)
+
+    def mean(self, resource_type: str) -> float | None:
+        with self._lock:
+            total, count = self._totals.get(resource_type, (0, 0))
+        return total / count if count else None
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._totals).encode("utf-8")
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+
+
+_typical_sizes = _TypicalSizes()
+
+
+def read_network_usage(browser) -> dict:
+    """Drain the driver's performance log and total the requests since the last read."""
+    usage = {"requests": 0, "transferred": 0, "blocked": 0, "blocked_bytes": 0, "blocked_unsized": 0}
+    try:
+        entries = browser.get_log("performance")
+    except Exception:
+        # Driver started without performance logging (or not a Chrome driver)
+        return usage
+
+    types: dict[str, str] = {}
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        method, params = message.get("method"), message.get("params") or {}
+        if method in ("Network.requestWillBeSent", "Network.responseReceived"):
+            types[params.get("requestId")] = params.get("type") or "Other"
+        elif method == "Network.loadingFinished":
+            size = int(params.get("encodedDataLength") or 0)
+            usage["requests"] += 1
+            usage["transferred"] += size
+            _typical_sizes.add(types.get(params.get("requestId"), "Other"), size)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            usage["blocked"] += 1
+            estimate = _typical_sizes.mean(params.get("type") or types.get(params.get("requestId"), "Other"))
+            if estimate is None:
+                usage["blocked_unsized"] += 1
+            else:
+                usage["blocked_bytes"] += int(estimate)
+    return usage
+
+
+def _log_network_usage(browser, block_profile: str):
+    usage = read_network_usage(browser)
+    if not usage["requests"] and not usage["blocked"]:
+        return
+    unsized = f", {usage['blocked_unsized']} of unknown size" if usage["blocked_unsized"] else ""
+    logger.info(
+        f"Scrape network: {usage['requests']} requests, {usage['transferred'] / 1024:.0f} KiB transferred; "
+        f"blocked {usage['blocked']} requests, ~{usage['blocked_bytes'] / 1024:.0f} KiB saved{unsized} "
+        f"(resource blocking: {block_profile})"
+    )
+    try:
+        _typical_sizes.save()
+    except OSError:
+        logger.warning("Could not save resource size samples")
+
+
+# ---------------------------------------------------------------------------
+# In-flight request counter
+# ---------------------------------------------------------------------------
+# Counts fetch/XHR requests that have started but not finished, so the scroll
+# loop can tell a feed request still in flight from an idle page (resource
+# timing entries only appear once a request completes). Installed on every
+# new document before page scripts run; the scroll loop also runs it, which
+# is a no-op once installed.
+IN_FLIGHT_COUNTER_JS = """
+if (!window.__scrapeNet) {
+    const net = window.__scrapeNet = {pending: 0};
+    const done = () => { net.pending = Math.max(0, net.pending - 1); };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            net.pending++;
+            return fetch.apply(this, arguments).finally(done);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending++;
+        this.addEventListener('loadend', done, {once: true});
+        return send.apply(this, arguments);
+    };
+}
+"""
+
+
+def _install_request_counter(browser):
+    browser.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": IN_FLIGHT_COUNTER_JS})
+
+
+# ---------------------------------------------------------------------------
+# Driver setup and login
+# ---------------------------------------------------------------------------
+def new_browser(block_profile: str = BLOCK_RESOURCES):
+    """Launch a headless Chrome driver with the given resource-blocking profile."""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    # DevTools Network events for read_network_usage
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    if block_profile in ("media", "strict"):
+        # Also stop image decoding for images served without a file extension
+        chrome_options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    browser = webdriver.Chrome(options=chrome_options)
+    browser.set_window_size(1920, 1080)
+    _apply_resource_blocking(browser, block_profile)
+    _install_request_counter(browser)
+    return browser
+
+
+def _wait_for_nav(browser, timeout: int) -> bool:
+    try:
+        WebDriverWait(browser, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#global-nav"))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def login(
+    browser,
+    cookie_path: str | None = None,
+    email: str | None = None,
+    password: str | None = None,
+):
+    """Log the browser in with credentials or a cookie file. Raises RuntimeError on failure.
+
+    Cookies (from the cookie file, or a session saved by an earlier credential
+    login) are injected before the first navigation, so a valid session costs
+    a single page load.
+    """
+    if email and password:
+        saved = session_manager.load_saved_session(email)
+        if saved:
+            session_manager.inject_cookies(browser, saved)
+            browser.get("https://www.linkedin.com/feed/")
+            if _wait_for_nav(browser, 10):
+                return
+            logger.info("Saved LinkedIn session expired, logging in with credentials")
+            session_manager.forget_session(email)
+            browser.delete_all_cookies()
+
+        browser.get("https://www.linkedin.com/login")
+        email_field = WebDriverWait(browser, 10).until(
+            EC.presence_of_element_located((By.ID, "username"))
+        )
+        email_field.clear()
+        email_field.send_keys(email)
+        password_field = browser.find_element(By.ID, "password")
+        password_field.clear()
+        password_field.send_keys(password)
+        password_field.submit()
+        if not _wait_for_nav(browser, 20):
+            raise RuntimeError("Login failed — check your credentials.")
+        try:
+            session_manager.save_session(browser, email)
+        except Exception:
+            logger.exception("Could not save LinkedIn session cookies")
+        return
+
+    if cookie_path:
+        session_manager.inject_cookies(browser, session_manager.parse_cookie_file(cookie_path))
+        browser.get("https://www.linkedin.com/feed/")
+
+    if not _wait_for_nav(browser, 20):
+        raise RuntimeError("Login failed — check your credentials.")
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+class _PooledBrowser:
+    def __init__(self, key: tuple, driver):
+        self.key = key
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class BrowserPool:
+    """Keeps up to `size` logged-in drivers and leases them to scrape jobs.
+
+    A size of 0 disables pooling: every lease launches and quits its own driver.
+    """
+
+    def __init__(self, size: int, max_pages: int, max_memory_mb: int, block_profile: str = "none"):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.block_profile = block_profile
+        self._idle: list[_PooledBrowser] = []
+        self._active = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(size, 1))
+
+    @contextmanager
+    def lease(
+        self,
+        cookie_path: str | None = None,
+        email: str | None = None,
+        password: str | None = None,
+    ):
+        """Yield a logged-in driver, reusing a warm one for the same identity if possible."""
+        if self.size <= 0:
+            browser = new_browser(self.block_profile)
+            try:
+                login(browser, cookie_path, email, password)
+                read_network_usage(browser)  # count the scrape, not the login
+                yield browser
+                _log_network_usage(browser, self.block_profile)
+            finally:
+                browser.quit()
+            return
+
+        key = (cookie_path, email)
+        self._slots.acquire()
+        entry = None
+        try:
+            entry = self._checkout(key)
+            if entry is None:
+                entry = self._launch(key, cookie_path, email, password)
+            # Each lease navigates to one search or profile feed
+            entry.pages += 1
+            # Drop events left from the login or the previous job
+            read_network_usage(entry.driver)
+            yield entry.driver
+            _log_network_usage(entry.driver, self.block_profile)
+        except GeneratorExit:
+            # A streaming caller stopped early; the driver is still usable
+            raise
+        except BaseException:
+            # Don't hand a driver in an unknown state to the next job
+            if entry is not None:
+                self._discard(entry)
+                entry = None
+            raise
+        finally:
+            if entry is not None:
+                self._checkin(entry)
+            self._slots.release()
+
+    def close(self):
+        """Quit all idle drivers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            _quit(entry.driver)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "active": self._active}
+
+    def _checkout(self, key: tuple) -> _PooledBrowser | None:
+        while True:
+            with self._lock:
+                entry = next((e for e in self._idle if e.key == key), None)
+                if entry is None:
+                    return None
+                self._idle.remove(entry)
+                self._active += 1
+            if _is_healthy(entry.driver):
+                return entry
+            logger.info("Discarding unhealthy pooled browser")
+            self._discard(entry)
+
+    def _launch(self, key, cookie_path, email, password) -> _PooledBrowser:
+        # Make room by evicting the oldest idle driver of another identity
+        with self._lock:
+            evicted = None
+            if self._idle and len(self._idle) + self._active >= self.size:
+                evicted = min(self._idle, key=lambda e: e.created_at)
+                self._idle.remove(evicted)
+            self._active += 1
+        if evicted:
+            _quit(evicted.driver)
+
+        try:
+            browser = new_browser(self.block_profile)
+        except BaseException:
+            with self._lock:
+                self._active -= 1
+            raise
+        entry = _PooledBrowser(key, browser)
+        try:
+            login(browser, cookie_path, email, password)
+        except BaseException:
+            self._discard(entry)
+            raise
+        return entry
+
+    def _checkin(self, entry: _PooledBrowser):
+        if entry.pages >= self.max_pages:
+            logger.info(f"Recycling pooled browser after {entry.pages} pages")
+            self._discard(entry)
+            return
+        if self.max_memory_mb and _heap_mb(entry.driver) > self.max_memory_mb:
+            logger.info("Recycling pooled browser over memory limit")
+            self._discard(entry)
+            return
+        with self._lock:
+            self._active -= 1
+            self._idle.append(entry)
+
+    def _discard(self, entry: _PooledBrowser):
+        with self._lock:
+            self._active -= 1
+        _quit(entry.driver)
+
+
+def _is_healthy(driver) -> bool:
+    """Driver still responds and is still logged in."""
+    try:
+        driver.execute_script("return 1;")
+        return bool(driver.find_elements(By.CSS_SELECTOR, "#global-nav"))
+    except WebDriverException:
+        return False
+
+
+def _heap_mb(driver) -> float:
+    try:
+        used = driver.execute_script(
+            "return performance.memory ? performance.memory.usedJSHeapSize : 0;"
+        )
+        return (used or 0) / (1024 * 1024)
+    except WebDriverException:
+        return 0.0
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+pool = BrowserPool(BROWSER_POOL_SIZE, BROWSER_MAX_PAGES, BROWSER_MAX_MEMORY_MB, BLOCK_RESOURCES)
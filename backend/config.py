@@ -8,6 +8,84 @@ DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR
 COOKIE_FILE = os.path.join(UPLOAD_DIR, "linkedin_cookies.txt")
 CREDENTIALS_FILE = os.path.join(DATA_DIR, "credentials.json")
 
+# BeautifulSoup tree builder: "html.parser", "lxml", or "auto" (lxml if
+# installed). Run `python parsing.py` on saved pages before switching.
+HTML_PARSER = os.environ.get("HTML_PARSER", "html.parser")
+
+# Warm Chrome pool for Selenium scrapes (size 0 disables pooling)
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", "50"))
+BROWSER_MAX_MEMORY_MB = int(os.environ.get("BROWSER_MAX_MEMORY_MB", "1024"))
+
+# Resources Chrome skips during scrapes: "none", "media" (images, video, fonts),
+# or "strict" (media plus tracking/ads scripts)
+BLOCK_RESOURCES = os.environ.get("BLOCK_RESOURCES", "media")
+
+# Concurrent DuckDuckGo queries for multi-query searches
+DDG_MAX_CONCURRENCY = int(os.environ.get("DDG_MAX_CONCURRENCY", "4"))
+
+# Persistent DuckDuckGo response cache (0 disables caching)
+DDG_CACHE_MAX_ENTRIES = int(os.environ.get("DDG_CACHE_MAX_ENTRIES", "5000"))
+
+# Content enrichment fetches: parallel workers, requests/second per host, retries on 429/5xx
+ENRICH_CONCURRENCY = int(os.environ.get("ENRICH_CONCURRENCY", "4"))
+ENRICH_HOST_RATE = float(os.environ.get("ENRICH_HOST_RATE", "1.0"))
+ENRICH_MAX_RETRIES = int(os.environ.get("ENRICH_MAX_RETRIES", "3"))
+
+# Persistent enrichment queue: posts claimed per worker pass, attempts before a
+# post is given up on, the first retry delay (doubles on each attempt), and how
+# long a claimed batch may run before another worker treats it as abandoned
+ENRICH_QUEUE_BATCH = int(os.environ.get("ENRICH_QUEUE_BATCH", "50"))
+ENRICH_QUEUE_MAX_ATTEMPTS = int(os.environ.get("ENRICH_QUEUE_MAX_ATTEMPTS", "5"))
+ENRICH_QUEUE_RETRY_MINUTES = float(os.environ.get("ENRICH_QUEUE_RETRY_MINUTES", "30"))
+ENRICH_QUEUE_LEASE_MINUTES = float(os.environ.get("ENRICH_QUEUE_LEASE_MINUTES", "30"))
+
+# Rows written per transaction in enrichment/analysis passes; smaller chunks
+# hold the SQLite write lock for less time
+ENRICH_COMMIT_CHUNK = int(os.environ.get("ENRICH_COMMIT_CHUNK", "200"))
+
+# How long a full-table background pass (analysis, cached-HTML re-extraction)
+# may go without committing a chunk before another web worker treats it as
+# abandoned and may start it again
+ANALYSIS_LEASE_MINUTES = float(os.environ.get("ANALYSIS_LEASE_MINUTES", "10"))
+
+# Rows fetched per query by read-only streaming passes (exports, startup scans)
+SCAN_CHUNK = int(os.environ.get("SCAN_CHUNK", "2000"))
+
+# Web server worker processes (gunicorn reads the same variable for its -w default)
+WEB_CONCURRENCY = max(int(os.environ.get("WEB_CONCURRENCY", "1")), 1)
+
+# Processes for sentiment analysis per web worker (1 runs it in the calling
+# thread); by default the CPUs are split between the web workers' pools
+ANALYSIS_WORKERS = int(os.environ.get(
+    "ANALYSIS_WORKERS", str(max((os.cpu_count() or 1) // WEB_CONCURRENCY, 1))
+))
+
+# Sentiment scorer: "textblob" (per post) or "lexicon" (batch scorer over
+# TextBlob's lexicon, see services/sentiment_engine.py for its tolerance)
+SENTIMENT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "textblob")
+
+# Engagement scores are normalized against this percentile of raw engagement
+# across all posts; all stored scores are rescaled once it drifts by more
+# than ENGAGEMENT_RESCORE_DRIFT (fraction) from the value they were scored with
+ENGAGEMENT_PERCENTILE = float(os.environ.get("ENGAGEMENT_PERCENTILE", "99"))
+ENGAGEMENT_RESCORE_DRIFT = float(os.environ.get("ENGAGEMENT_RESCORE_DRIFT", "0.1"))
+
+# Shared outbound HTTP client (http_client.py)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+
+# Raw post-page HTML cache (services/html_cache.py); failed fetches are
+# skipped until the failure TTL expires
+HTML_CACHE_DIR = os.environ.get("HTML_CACHE_DIR", os.path.join(DATA_DIR, "html_cache"))
+HTML_CACHE_MAX_MB = int(os.environ.get("HTML_CACHE_MAX_MB", "500"))
+HTML_CACHE_FAILURE_TTL_HOURS = float(os.environ.get("HTML_CACHE_FAILURE_TTL_HOURS", "24"))
+
+# When set, Selenium scrapes save a page_source snapshot per scroll step here
+# (for offline replay with replay.py)
+SCRAPE_RECORD_DIR = os.environ.get("SCRAPE_RECORD_DIR", "")
+
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -0,0 +1,223 @@
+"""
+Chunked keyset iteration and resumable checkpoints for long database passes.
+
+Passes that touch many rows walk the table in key order, one chunk per
+query (and per transaction when writing), instead of loading everything
+with .all() and committing once. Combined with column projection
+(db.query(Post.id, Post.content) rather than full Post objects) and
+bulk_update, memory stays flat however large the table grows and the
+SQLite write lock is held briefly. A pass can record the last key it
+committed, in the same transaction as the chunk, and continue from there
+after a crash.
+
+Passes that must not run twice at once across web worker processes hold
+a lease on their pass_runs row. The lease is renewed with every chunk, so
+a pass whose process died is taken over once it expires; the row also
+carries the progress the status endpoints report.
+
+Run `python db_chunks.py` to compare peak RSS of a full-table pass with
+.all() against the streaming version at increasing table sizes.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import or_, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Query, Session
+
+from models import PassCheckpoint, PassRun
+
+
+def iter_keyset(query: Query, key, chunk_size: int, after=None, descending: bool = False) -> Iterator[list]:
+    """Yield lists of up to chunk_size rows from `query`, ordered by `key`.
+
+    Each chunk is fetched with `key > last_key`, so rows the caller changes
+    (even out of the query's filter) never shift the next page. `key` may
+    be a tuple of columns for a composite order, as in (date, id); the
+    columns must be selected by the query, contain no NULLs (coalesce and
+    label them), and end in a unique one. `after` is then a tuple too.
+    """
+    chunk_size = max(chunk_size, 1)
+    keys = key if isinstance(key, tuple) else (key,)
+    position = keys[0] if len(keys) == 1 else tuple_(*keys)
+    order = [k.desc() for k in keys] if descending else list(keys)
+    last = after
+    while True:
+        if last is None:
+            page = query
+        else:
+            bound = last if len(keys) == 1 else tuple_(*last)
+            page = query.filter(position < bound if descending else position > bound)
+        rows = page.order_by(*order).limit(chunk_size).all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        values = tuple(getattr(rows[-1], k.key) for k in keys)
+        last = values[0] if len(keys) == 1 else values
+
+
+def iter_rows(query: Query, key, chunk_size: int, after=None, descending: bool = False) -> Iterator:
+    """Rows of iter_keyset one at a time, for read-only passes."""
+    for rows in iter_keyset(query, key, chunk_size, after=after, descending=descending):
+        yield from rows
+
+
+def bulk_update(db: Session, model, mappings: list[dict]):
+    """UPDATE rows of `model` by primary key from dicts ({"id": ..., column: value}),
+    as one executemany instead of loading and flushing ORM objects."""
+    if mappings:
+        db.execute(update(model), mappings)
+
+
+def get_checkpoint(db: Session, name: str) -> PassCheckpoint | None:
+    return db.get(PassCheckpoint, name)
+
+
+def set_checkpoint(db: Session, name: str, last_key, processed: int):
+    """Record progress; committed together with the caller's chunk."""
+    checkpoint = db.get(PassCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = PassCheckpoint(name=name)
+        db.add(checkpoint)
+    checkpoint.last_key = last_key
+    checkpoint.processed = processed
+    checkpoint.updated_at = datetime.utcnow()
+
+
+def clear_checkpoint(db: Session, name: str):
+    db.query(PassCheckpoint).filter(PassCheckpoint.name == name).delete()
+
+
+def run_progress(db: Session, name: str) -> dict:
+    """Status and progress of a leased pass, as the status endpoints report it.
+
+    A running pass whose lease expired is reported as failed: its process
+    died, and the next start resumes from its checkpoint.
+    """
+    run = db.get(PassRun, name)
+    if run is None:
+        return {
+            "status": "idle", "total": 0, "processed": 0, "succeeded": 0,
+            "started_at": None, "finished_at": None, "error": None,
+        }
+    status, error = run.status, run.error
+    if status == "running" and run.lease_until and run.lease_until < datetime.utcnow():
+        status, error = "failed", "Pass was interrupted"
+    return {
+        "status": status, "total": run.total, "processed": run.processed,
+        "succeeded": run.succeeded, "started_at": run.started_at,
+        "finished_at": run.finished_at, "error": error,
+    }
+
+
+def acquire_lease(db: Session, name: str, owner: str, minutes: float) -> bool:
+    """Mark the pass running for `owner` unless another live lease holds it.
+
+    Commits. Returns False when another process is running the pass.
+    """
+    now = datetime.utcnow()
+    db.execute(sqlite_insert(PassRun).values(name=name).on_conflict_do_nothing(index_elements=["name"]))
+    acquired = db.execute(
+        update(PassRun)
+        .where(
+            PassRun.name == name,
+            or_(PassRun.status != "running", PassRun.lease_until.is_(None), PassRun.lease_until < now),
+        )
+        .values(
+            status="running", owner=owner, lease_until=now + timedelta(minutes=minutes),
+            total=0, processed=0, succeeded=0, error=None, started_at=now, finished_at=None,
+        )
+    ).rowcount
+    db.commit()
+    return acquired == 1
+
+
+def renew_lease(db: Session, name: str, owner: str, minutes: float, **progress) -> bool:
+    """Extend the lease and record progress (total, processed, succeeded);
+    committed together with the caller's chunk. Returns False if the lease
+    expired and another process took the pass over.
+    """
+    return db.execute(
+        update(PassRun)
+        .where(PassRun.name == name, PassRun.owner == owner, PassRun.status == "running")
+        .values(lease_until=datetime.utcnow() + timedelta(minutes=minutes), **progress)
+    ).rowcount == 1
+
+
+def release_lease(db: Session, name: str, owner: str, status: str, error: str | None = None):
+    """Record how the pass ended and free the lease. Commits."""
+    db.execute(
+        update(PassRun)
+        .where(PassRun.name == name, PassRun.owner == owner)
+        .values(status=status, error=error, lease_until=None, finished_at=datetime.utcnow())
+    )
+    db.commit()
+
+
+if __name__ == "__main__":
+    # Peak RSS of a full-table pass, .all() vs streaming: python db_chunks.py [n_posts ...]
+    import os
+    import sys
+    import resource
+    import subprocess
+    import tempfile
+
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from models import Post
+
+    def peak_rss_mb() -> float:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+    def score(reactions, comments):
+        return float((reactions or 0) + (comments or 0) * 2)
+
+    if sys.argv[1:2] == ["--pass"]:
+        # Child process: one pass over the table, then report peak RSS
+        mode, url = sys.argv[2], sys.argv[3]
+        db = sessionmaker(bind=create_engine(url))()
+        before = peak_rss_mb()
+        if mode == "all":
+            for post in db.query(Post).all():
+                post.engagement_score = score(post.reactions, post.comments)
+            db.commit()
+        else:
+            query = db.query(Post.id, Post.reactions, Post.comments)
+            for rows in iter_keyset(query, Post.id, 2000):
+                bulk_update(db, Post, [{"id": r.id, "engagement_score": score(r.reactions, r.comments)} for r in rows])
+                db.commit()
+        print(before, peak_rss_mb())
+        sys.exit(0)
+
+    sizes = [int(a) for a in sys.argv[1:]] or [25_000, 50_000, 100_000, 200_000]
+    filler = "Sharing a few lessons from this quarter on hiring, growth and product. " * 12
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        print(f"{'posts':>9}  {'.all() peak MB':>15}  {'streaming peak MB':>18}  (baseline after imports)")
+        count = 0
+        for size in sorted(sizes):
+            with engine.begin() as conn:
+                while count < size:
+                    batch = range(count, min(size, count + 5000))
+                    conn.execute(insert(Post), [
+                        {"post_id": f"bench-{i}", "post_url": f"https://example.com/{i}",
+                         "content": f"{filler}{i}", "reactions": i % 500, "comments": i % 40}
+                        for i in batch
+                    ])
+                    count += len(batch)
+            peaks = {}
+            for mode in ("all", "stream"):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--pass", mode, url],
+                    capture_output=True, text=True, check=True,
+                ).stdout.split()
+                peaks[mode] = (float(out[-2]), float(out[-1]))
+            print(f"{size:>9}  {peaks['all'][1]:>15.0f}  {peaks['stream'][1]:>18.0f}  ({peaks['stream'][0]:.0f})")
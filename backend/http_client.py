@@ -0,0 +1,117 @@
+"""
+Shared outbound HTTP client.
+
+One pooled requests.Session with keep-alive, compressed transfer
+negotiation (gzip/deflate, plus br when a brotli package is installed) and
+separate connect/read timeouts. Tracks request, new-connection and byte
+counters so connection reuse and transfer savings are visible.
+"""
+
+import codecs
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+from config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_SIZE
+
+# A stream abandoned with at most this many undelivered bytes is drained so its
+# keep-alive connection can go back to the pool; larger remainders are cut off
+_DRAIN_LIMIT = 64 * 1024
+
+_stats = {"requests": 0, "new_connections": 0, "bytes_transferred": 0, "bytes_decoded": 0}
+_stats_lock = threading.Lock()
+
+
+def _bump(stat: str, n: int = 1):
+    with _stats_lock:
+        _stats[stat] += n
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _bump("new_connections")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _bump("new_connections")
+        return super()._new_conn()
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = _CountingAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=0,  # callers own their retry policy
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+session = _build_session()
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session with default timeouts, recording transfer stats."""
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    resp = session.get(url, **kwargs)
+    _bump("requests")
+    if not kwargs.get("stream"):
+        # raw.tell() counts body bytes as received (before decompression)
+        _bump("bytes_transferred", resp.raw.tell())
+        _bump("bytes_decoded", len(resp.content))
+    return resp
+
+
+def iter_text(resp: requests.Response, chunk_size: int = 16 * 1024):
+    """Decoded text chunks from a stream=True response.
+
+    The caller may stop early; closing the generator records transfer stats
+    and releases the connection.
+    """
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    decoded = 0
+    try:
+        for chunk in resp.iter_content(chunk_size):
+            decoded += len(chunk)
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    finally:
+        _bump("bytes_transferred", resp.raw.tell())
+        _bump("bytes_decoded", decoded)
+        _release(resp)
+
+
+def _release(resp: requests.Response):
+    length = resp.headers.get("Content-Length", "")
+    remaining = int(length) - resp.raw.tell() if length.isdigit() else None
+    if remaining is not None and remaining <= _DRAIN_LIMIT:
+        resp.raw.drain_conn()
+        resp.raw.release_conn()
+    else:
+        resp.close()
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["reused_connections"] = max(stats["requests"] - stats["new_connections"], 0)
+    stats["accept_encoding"] = ACCEPT_ENCODING
+    return stats
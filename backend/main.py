@@ -20,6 +20,8 @@ with engine.connect() as conn:
         "topics": "TEXT",
         "hashtags": "TEXT",
         "engagement_score": "FLOAT",
+        "content_hash": "VARCHAR",
+        "analysis_version": "VARCHAR",
     }
     for col, col_type in migrations.items():
         if col not in existing_cols:
@@ -67,51 +69,55 @@ with engine.connect() as conn:
 # Fix date_collected for existing posts using LinkedIn activity ID timestamps
 from scraper import _activity_id_to_datetime
 from database import SessionLocal
+from db_chunks import iter_keyset, bulk_update
+from config import SCAN_CHUNK
 from models import Post
+from url_classifier import classifier as url_classifier
 
 # Delete junk posts that slipped through old filters
+from models import EnrichmentTask
+from services import engagement_stats
+
 _db = SessionLocal()
 try:
-    _junk = _db.query(Post).filter(
-        or_(
-            Post.post_url.like('%business.linkedin.com%'),
-            Post.post_url.like('%training.linkedin.com%'),
-            Post.post_url.like('%training.talent.linkedin.com%'),
-            Post.post_url.like('%news.linkedin.com%'),
-            Post.post_url.like('%engineering.linkedin.com%'),
-            Post.post_url.like('%/jobs/%'),
-            Post.post_url.like('%/help/%'),
-            Post.post_url.like('%/learning/%'),
-            Post.post_url.like('%/company/%'),
-            Post.post_url.like('%/school/%'),
-            Post.post_url.like('%/events/%'),
-            Post.post_url.like('%/advice/%'),
-            Post.post_url.like('%/legal/%'),
-        )
-    ).delete(synchronize_session=False)
+    _junk_ids = _db.query(Post.id).filter(
+        or_(*[Post.post_url.like(p) for p in url_classifier.sql_junk_patterns()])
+    )
+    _db.query(EnrichmentTask).filter(EnrichmentTask.post_id.in_(_junk_ids.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+    _junk = _db.query(Post).filter(Post.id.in_(_junk_ids.scalar_subquery())).delete(synchronize_session=False)
     if _junk:
+        # Recount the engagement histogram without them, in the same transaction
+        engagement_stats.rebuild(_db)
         _db.commit()
         print(f"Cleaned up {_junk} junk posts")
+    else:
+        _db.rollback()
 finally:
     _db.close()
 
 # Fix date_collected for existing posts using LinkedIn activity ID timestamps
 _db = SessionLocal()
 try:
-    _posts = _db.query(Post).all()
     _fixed = 0
-    for _p in _posts:
-        actual = _activity_id_to_datetime(_p.post_id)
-        if actual and _p.date_collected:
+    _dated = _db.query(Post.id, Post.post_id, Post.date_collected, Post.post_time).filter(
+        Post.date_collected.isnot(None)
+    )
+    for _rows in iter_keyset(_dated, Post.id, SCAN_CHUNK):
+        _updates = []
+        for _p in _rows:
+            actual = _activity_id_to_datetime(_p.post_id)
             # Only fix if dates differ by more than 1 hour (i.e. wrong date)
-            diff = abs((_p.date_collected - actual).total_seconds())
-            if diff > 3600:
-                _p.date_collected = actual
+            if actual and abs((_p.date_collected - actual).total_seconds()) > 3600:
+                _fix = {"id": _p.id, "date_collected": actual}
                 if not _p.post_time:
-                    _p.post_time = actual.strftime("%b %d, %Y")
-                _fixed += 1
-    if _fixed:
-        _db.commit()
+                    _fix["post_time"] = actual.strftime("%b %d, %Y")
+                _updates.append(_fix)
+        if _updates:
+            bulk_update(_db, Post, _updates)
+            _db.commit()
+            _fixed += len(_updates)
 finally:
     _db.close()
 
@@ -137,7 +143,29 @@ app.include_router(monitor.router)
 @app.on_event("startup")
 def on_startup():
     from services.scheduler_service import start_scheduler
+    from services.enrichment_queue import worker
+    from services.analysis_service import reanalyze_if_stale
+    from services.engagement_stats import refresh as refresh_engagement
     start_scheduler()
+    worker.start()
+    # Rescale stored engagement scores if they predate the current reference
+    db = SessionLocal()
+    try:
+        refresh_engagement(db)
+    finally:
+        db.close()
+    # Runs in every web worker; only the one that gets the pass lease re-analyzes
+    reanalyze_if_stale()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    from browser_pool import pool
+    from services.enrichment_queue import worker
+    from services.analysis_service import shutdown_pool
+    worker.stop()
+    shutdown_pool()
+    pool.close()
 
 
 @app.get("/api/health")
@@ -27,6 +27,8 @@ class Post(Base):
     topics = Column(Text, nullable=True)  # JSON list
     hashtags = Column(Text, nullable=True)  # comma-separated
     engagement_score = Column(Float, nullable=True)
+    content_hash = Column(String, nullable=True)  # SHA-1 of the content that was analyzed
+    analysis_version = Column(String, nullable=True)
 
     bookmarks = relationship("Bookmark", back_populates="post", cascade="all, delete-orphan")
 
@@ -83,3 +85,72 @@ class MonitorResult(Base):
     job_id = Column(String, nullable=True)
 
     saved_search = relationship("SavedSearch", back_populates="results")
+
+
+class SearchCacheEntry(Base):
+    __tablename__ = "search_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)
+    search_query = Column(String)
+    results = Column(Text)  # JSON list of raw DDG results
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+    hits = Column(Integer, default=0)
+
+
+class EnrichmentTask(Base):
+    __tablename__ = "enrichment_queue"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), unique=True, nullable=False)
+    status = Column(String, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PassCheckpoint(Base):
+    __tablename__ = "pass_checkpoints"
+
+    name = Column(String, primary_key=True)
+    last_key = Column(Integer, nullable=True)
+    processed = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PassRun(Base):
+    """Status, progress and cross-process lease of a background pass; see db_chunks.py."""
+    __tablename__ = "pass_runs"
+
+    name = Column(String, primary_key=True)
+    status = Column(String, default="idle")  # idle, running, completed, failed
+    owner = Column(String, nullable=True)
+    lease_until = Column(DateTime, nullable=True)
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class EngagementBucket(Base):
+    """Histogram of raw post engagement; see services/engagement_stats.py."""
+    __tablename__ = "engagement_buckets"
+
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0)
+
+
+class EngagementReference(Base):
+    """Single row: engagement max and the reference stored scores were computed with."""
+    __tablename__ = "engagement_reference"
+
+    id = Column(Integer, primary_key=True)
+    max_raw = Column(Integer, default=0)
+    scored_reference = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,109 @@
+"""HTML parser backend selection shared by the scrapers and content fetcher."""
+
+import os
+import logging
+
+from bs4 import BeautifulSoup
+
+from config import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+# Preferred order when HTML_PARSER is "auto": fastest available first
+_AUTO_ORDER = ["lxml", "html.parser"]
+
+
+def _parser_available(name: str) -> bool:
+    try:
+        BeautifulSoup("", name)
+        return True
+    except Exception:
+        return False
+
+
+def _resolve_parser(requested: str) -> str:
+    """Pick the BeautifulSoup tree builder to use, falling back to html.parser."""
+    if requested and requested != "auto":
+        if _parser_available(requested):
+            return requested
+        logger.warning(f"HTML parser '{requested}' is not available, falling back to html.parser")
+        return "html.parser"
+    for name in _AUTO_ORDER:
+        if _parser_available(name):
+            return name
+    return "html.parser"
+
+
+PARSER = _resolve_parser(HTML_PARSER)
+
+
+def make_soup(markup: str, parser: str | None = None) -> BeautifulSoup:
+    """Build a BeautifulSoup tree with the configured parser backend."""
+    return BeautifulSoup(markup, parser or PARSER)
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+
+def _html_files(paths: list[str]) -> list[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(".html"))
+        else:
+            files.append(path)
+    return files
+
+
+if __name__ == "__main__":
+    # Parity check between tree builders: python parsing.py [page.html | dir ...]
+    # Runs the feed parser and the post-page extractor over the fixture corpus
+    # (plus any saved pages or SCRAPE_RECORD_DIR recordings given) with each
+    # available backend and prints every field that differs. Exits 1 on a diff.
+    import sys
+    import time
+
+    from scraper import _parse_posts_from_soup
+    from services.post_meta import _extract_with_soup
+
+    backends = [b for b in ("html.parser", "lxml") if _parser_available(b)]
+    if len(backends) < 2:
+        sys.exit(f"Need both html.parser and lxml installed, have: {backends}")
+
+    def extract(html: str, parser: str) -> dict:
+        feed = _parse_posts_from_soup(make_soup(html, parser), set())
+        for post in feed:
+            post.pop("date_collected", None)
+        return {"feed": feed, "post": _extract_with_soup(html, parser)}
+
+    files = _html_files(sys.argv[1:] or [FIXTURE_DIR])
+    timings = dict.fromkeys(backends, 0.0)
+    diffs = 0
+    for path in files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        results = {}
+        for backend in backends:
+            started = time.perf_counter()
+            results[backend] = extract(html, backend)
+            timings[backend] += time.perf_counter() - started
+
+        reference, other = (results[b] for b in backends)
+        if reference == other:
+            continue
+        diffs += 1
+        print(f"DIFF {path}")
+        if reference["post"] != other["post"]:
+            print(f"  post  {backends[0]}: {reference['post']}\n        {backends[1]}: {other['post']}")
+        if len(reference["feed"]) != len(other["feed"]):
+            print(f"  feed  {len(reference['feed'])} vs {len(other['feed'])} posts")
+        for a, b in zip(reference["feed"], other["feed"]):
+            for field in a:
+                if a[field] != b.get(field):
+                    print(f"  {a['post_id']}.{field}  {backends[0]}: {a[field]!r}\n"
+                          f"  {' ' * len(a['post_id'])} {' ' * len(field)}  {backends[1]}: {b.get(field)!r}")
+
+    speed = "  ".join(f"{b}: {t:.3f}s" for b, t in timings.items())
+    print(f"{len(files)} pages  {speed}  pages with differences: {diffs}")
+    sys.exit(1 if diffs else 0)
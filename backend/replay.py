@@ -0,0 +1,235 @@
+"""
+Offline replay of recorded feed pages through the Selenium scroll/parse loop.
+
+A recording is a directory of page_source snapshots, one per scroll step
+(step_000.html, step_001.html, ...). ReplayDriver serves them to
+scraper._iter_scroll_batches in place of a live browser, so the exact same
+extraction, parse and dedupe code runs without network access.
+
+Record:  SCRAPE_RECORD_DIR=/tmp/rec  (then run a normal profile/search scrape)
+Replay:  python replay.py /tmp/rec/profile-<timestamp> [--max-posts N] [--full]
+Check:   python replay.py   (replays fixtures/recordings; exits 1 if a post is missed)
+"""
+
+import os
+import time
+from datetime import datetime
+
+from config import SCRAPE_RECORD_DIR
+from parsing import make_soup
+
+RECORDING_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recordings")
+
+
+def _snapshot_path(directory: str, step: int) -> str:
+    return os.path.join(directory, f"step_{step:03d}.html")
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+class RecordingDriver:
+    """Wraps a live driver and saves page_source at the start of every parse pass,
+    so snapshot N holds exactly what parse pass N saw.
+    """
+
+    def __init__(self, driver, directory: str):
+        self._driver = driver
+        self._directory = directory
+        self._step = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    @property
+    def page_source(self) -> str:
+        # Full-page mode: reading page_source is the parse pass
+        source = self._driver.page_source
+        self._save(source)
+        return source
+
+    def execute_script(self, script, *args):
+        from scraper import _COLLECT_NEW_UPDATES_JS
+
+        if script == _COLLECT_NEW_UPDATES_JS:
+            # Incremental mode: the collector script is the parse pass
+            self._save(self._driver.page_source)
+        return self._driver.execute_script(script, *args)
+
+    def _save(self, source: str):
+        with open(_snapshot_path(self._directory, self._step), "w", encoding="utf-8") as f:
+            f.write(source)
+        self._step += 1
+
+
+def maybe_record(driver, label: str):
+    """Wrap the driver in a RecordingDriver when SCRAPE_RECORD_DIR is set."""
+    if not SCRAPE_RECORD_DIR:
+        return driver
+    stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+    return RecordingDriver(driver, os.path.join(SCRAPE_RECORD_DIR, f"{label}-{stamp}"))
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+def _update_key(node) -> str | None:
+    """Identity of a feed update, mirroring the in-browser collector's URN check."""
+    urn = node.get("data-urn", "")
+    if "urn:li:activity:" in urn:
+        return urn
+    link = node.find("a", {"class": "update-components-mini-update-v2__link-to-details-page"})
+    href = link.get("href", "") if link else ""
+    if "urn:li:activity:" in href:
+        return href
+    return None
+
+
+class ReplayDriver:
+    """Stands in for a Selenium driver, serving one snapshot per scroll step.
+
+    Implements only what the scroll loop uses: page_source and the handful of
+    scripts it runs. Time spent emulating the browser is tracked separately so
+    the per-step report shows extraction/parse cost on its own.
+    """
+
+    def __init__(self, directory: str):
+        self.snapshots = []
+        step = 0
+        while os.path.isfile(_snapshot_path(directory, step)):
+            with open(_snapshot_path(directory, step), encoding="utf-8") as f:
+                self.snapshots.append(f.read())
+            step += 1
+        if not self.snapshots:
+            raise FileNotFoundError(f"No snapshots found in {directory}")
+        self.step = 0
+        self._seen: set[str] = set()
+        self._soup = None
+        self._step_started = time.perf_counter()
+        self._browser_time = 0.0
+        self.report: list[dict] = []
+
+    @property
+    def page_source(self) -> str:
+        return self.snapshots[self.step]
+
+    def execute_script(self, script, *args):
+        from scraper import _COLLECT_NEW_UPDATES_JS, _FEED_STATE_JS, _SCROLL_JS
+
+        started = time.perf_counter()
+        try:
+            if script == _SCROLL_JS:
+                self._end_step()
+                self.step = min(self.step + 1, len(self.snapshots) - 1)
+                self._soup = None
+                return None
+            if script == _COLLECT_NEW_UPDATES_JS:
+                return self._collect_new_updates()
+            if script == _FEED_STATE_JS:
+                return [len(self._updates()), self.step, 0]
+            raise NotImplementedError("ReplayDriver does not emulate this script")
+        finally:
+            self._browser_time += time.perf_counter() - started
+
+    def finish(self) -> list[dict]:
+        """Close the last step and return the per-step timing report."""
+        # A scroll past the final snapshot has already closed it
+        if not self.report or self.report[-1]["step"] != self.step:
+            self._end_step()
+        return self.report
+
+    def _updates(self):
+        if self._soup is None:
+            self._soup = make_soup(self.page_source)
+        return self._soup.find_all("div", {"class": "feed-shared-update-v2"})
+
+    def _collect_new_updates(self) -> list[str]:
+        fragments = []
+        for node in self._updates():
+            key = _update_key(node)
+            if key is None or key in self._seen:
+                continue
+            self._seen.add(key)
+            fragments.append(str(node))
+        return fragments
+
+    def _end_step(self):
+        now = time.perf_counter()
+        total = now - self._step_started
+        self.report.append({
+            "step": self.step,
+            "total_s": total,
+            "browser_s": self._browser_time,
+            "parse_s": total - self._browser_time,
+        })
+        self._step_started = now
+        self._browser_time = 0.0
+
+
+def replay_scrape(
+    directory: str,
+    max_posts: int = 1000,
+    max_no_new_posts: int = 3,
+    incremental: bool = True,
+) -> tuple[list[dict], list[dict]]:
+    """Run a recording through the scroll loop. Returns (posts, per-step report)."""
+    from scraper import _iter_scroll_batches, _AdaptiveWait
+
+    driver = ReplayDriver(directory)
+    # Snapshots are already fully loaded, so never wait
+    waiter = _AdaptiveWait(max_wait=0, min_wait=0, poll_interval=0, idle_window=0)
+    posts = [
+        post
+        for batch in _iter_scroll_batches(
+            driver,
+            max_posts=max_posts,
+            # One parse pass per snapshot; the scroll after the last one ends the loop
+            max_scroll_attempts=len(driver.snapshots),
+            max_no_new_posts=max_no_new_posts,
+            incremental=incremental,
+            waiter=waiter,
+        )
+        for post in batch
+    ]
+    return posts, driver.finish()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded feed snapshots")
+    parser.add_argument("directory", nargs="?", help="recording to replay (default: check the fixtures)")
+    parser.add_argument("--max-posts", type=int, default=1000)
+    parser.add_argument("--full", action="store_true", help="parse full page_source every pass")
+    args = parser.parse_args()
+
+    if args.directory is None:
+        # Every post in a recording's final snapshot must come out of the
+        # replay, in both extraction modes
+        import sys
+
+        from scraper import _parse_posts_from_soup
+
+        failures = 0
+        for name in sorted(os.listdir(RECORDING_FIXTURE_DIR)):
+            directory = os.path.join(RECORDING_FIXTURE_DIR, name)
+            with open(_snapshot_path(directory, len(ReplayDriver(directory).snapshots) - 1), encoding="utf-8") as f:
+                expected = {p["post_id"] for p in _parse_posts_from_soup(make_soup(f.read()), set())}
+            for incremental in (True, False):
+                got = {p["post_id"] for p in replay_scrape(directory, incremental=incremental)[0]}
+                mode = "incremental" if incremental else "full"
+                if got != expected:
+                    failures += 1
+                    print(f"FAIL {name} ({mode}): missing {sorted(expected - got)}, extra {sorted(got - expected)}")
+                else:
+                    print(f"ok   {name} ({mode}): {len(got)} posts")
+        sys.exit(1 if failures else 0)
+
+    posts, report = replay_scrape(args.directory, args.max_posts, incremental=not args.full)
+    for row in report:
+        print(f"step {row['step']:3d}  total {row['total_s'] * 1000:8.1f}ms  "
+              f"parse {row['parse_s'] * 1000:8.1f}ms  browser {row['browser_s'] * 1000:8.1f}ms")
+    total = sum(r["total_s"] for r in report)
+    parse = sum(r["parse_s"] for r in report)
+    print(f"{len(posts)} posts, {len(report)} steps, total {total:.3f}s, parse {parse:.3f}s")
@@ -9,9 +9,7 @@ from services.analytics_service import (
     get_overview, get_top_authors, get_trending_topics,
     get_engagement_over_time, get_sentiment_distribution, get_hashtag_frequency,
 )
-from services.analysis_service import enrich_all_posts
-
-import threading
+from services.analysis_service import start_enrich_all, get_enrich_progress
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -47,38 +45,48 @@ def hashtags(limit: int = Query(30, ge=1, le=100), db: Session = Depends(get_db)
 
 
 @router.post("/enrich")
-def enrich(db: Session = Depends(get_db)):
-    count = enrich_all_posts(db)
-    return {"enriched": count}
+def enrich():
+    """Start analyzing unanalyzed posts in the background; poll /enrich/status."""
+    return start_enrich_all()
+
+
+@router.get("/enrich/status")
+def enrich_status():
+    return get_enrich_progress()
 
 
 @router.post("/enrich-content")
-def enrich_content(db: Session = Depends(get_db)):
-    """Re-fetch full content for posts with truncated data or 0 engagement."""
-    from sqlalchemy import func, and_, or_
-    from models import Post
-
-    count = (
-        db.query(Post)
-        .filter(
-            or_(
-                func.length(Post.content) < 400,
-                and_(Post.reactions == 0, Post.comments == 0),
-            )
-        )
-        .count()
-    )
-
-    if count > 0:
-        def _run():
-            from database import SessionLocal
-            from services.content_fetcher import enrich_posts_needing_content
-            s = SessionLocal()
-            try:
-                enrich_posts_needing_content(s)
-            finally:
-                s.close()
-
-        threading.Thread(target=_run, daemon=True).start()
-
-    return {"enriching": count}
+def enrich_content(retry_failed: bool = Query(False), db: Session = Depends(get_db)):
+    """Queue posts with truncated data or 0 engagement for a content fetch.
+    Posts fetched before (done) or given up on (failed) are skipped unless
+    `retry_failed` is set, which queues them again with a fresh attempt count."""
+    from services.enrichment_queue import enqueue_posts_needing_content
+    return {"enriching": enqueue_posts_needing_content(db, force=retry_failed)}
+
+
+@router.get("/enrich-queue")
+def enrich_queue(db: Session = Depends(get_db)):
+    """Enrichment queue size by task status."""
+    from services.enrichment_queue import get_stats
+    return get_stats(db)
+
+
+@router.get("/fetch-stats")
+def fetch_stats():
+    """Connection reuse and transfer counters for outbound page fetches."""
+    import http_client
+    return http_client.get_stats()
+
+
+@router.post("/reextract-content")
+def reextract_content():
+    """Start re-running content extraction over cached post HTML (no network
+    fetches) in the background; poll /reextract-content/status."""
+    from services.content_fetcher import start_reextract
+    return start_reextract()
+
+
+@router.get("/reextract-content/status")
+def reextract_content_status():
+    from services.content_fetcher import get_reextract_progress
+    return get_reextract_progress()
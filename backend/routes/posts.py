@@ -1,11 +1,15 @@
 import csv
 import io
 import json
+import textwrap
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from schemas import PostOut, PostsResponse
-from database import get_db
+from config import SCAN_CHUNK
+from database import get_db, SessionLocal
+from db_chunks import iter_rows
 from services.search_service import search_posts
 from models import Post, Bookmark
 
@@ -43,75 +47,87 @@ def list_posts(
     return {"posts": enriched, "total": total, "page": page, "per_page": per_page}
 
 
+_EXPORT_FIELDS = (
+    "post_id", "post_url", "author_name", "author_jobtitle", "content",
+    "reactions", "comments", "impressions", "sentiment_label",
+    "engagement_score", "hashtags", "topics", "date_collected",
+)
+
+
+def _export_rows(q: str | None, collection_id: int | None):
+    """Matching posts, newest first, streamed in SCAN_CHUNK keyset pages.
+
+    Uses its own session: the response body is generated after the request's
+    session has been closed. NULL dates sort last, as with ORDER BY ... DESC.
+    """
+    sort_date = func.ifnull(Post.date_collected, "").label("sort_date")
+    db = SessionLocal()
+    try:
+        query = db.query(*[getattr(Post, f) for f in _EXPORT_FIELDS], Post.id, sort_date)
+
+        if q:
+            pattern = f"%{q}%"
+            query = query.filter(
+                or_(
+                    Post.content.ilike(pattern),
+                    Post.author_name.ilike(pattern),
+                )
+            )
+
+        if collection_id is not None:
+            bookmark_post_ids = db.query(Bookmark.post_id).filter(Bookmark.collection_id == collection_id).subquery()
+            query = query.filter(Post.id.in_(bookmark_post_ids))
+
+        yield from iter_rows(query, (sort_date, Post.id), SCAN_CHUNK, descending=True)
+    finally:
+        db.close()
+
+
+def _export_json(rows):
+    """Same layout as json.dumps(list, indent=2), one post at a time."""
+    yield "["
+    empty = True
+    for p in rows:
+        data = {f: getattr(p, f) for f in _EXPORT_FIELDS}
+        data["date_collected"] = p.date_collected.isoformat() if p.date_collected else None
+        yield ("\n" if empty else ",\n") + textwrap.indent(json.dumps(data, indent=2), "  ")
+        empty = False
+    yield "]" if empty else "\n]"
+
+
+def _export_csv(rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(_EXPORT_FIELDS)
+    for i, p in enumerate(rows, 1):
+        writer.writerow([
+            *(getattr(p, f) for f in _EXPORT_FIELDS[:-1]),
+            p.date_collected.isoformat() if p.date_collected else "",
+        ])
+        if i % SCAN_CHUNK == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue()
+
+
 @router.get("/export")
 def export_posts(
     format: str = Query("csv", pattern="^(csv|json)$"),
     q: str | None = Query(None),
     collection_id: int | None = Query(None),
-    db: Session = Depends(get_db),
 ):
-    query = db.query(Post)
-
-    if q:
-        from sqlalchemy import or_
-        pattern = f"%{q}%"
-        query = query.filter(
-            or_(
-                Post.content.ilike(pattern),
-                Post.author_name.ilike(pattern),
-            )
-        )
-
-    if collection_id is not None:
-        from models import Bookmark as BM
-        bookmark_post_ids = db.query(BM.post_id).filter(BM.collection_id == collection_id).subquery()
-        query = query.filter(Post.id.in_(bookmark_post_ids))
-
-    posts = query.order_by(Post.date_collected.desc()).all()
+    rows = _export_rows(q, collection_id)
 
     if format == "json":
-        data = []
-        for p in posts:
-            data.append({
-                "post_id": p.post_id,
-                "post_url": p.post_url,
-                "author_name": p.author_name,
-                "author_jobtitle": p.author_jobtitle,
-                "content": p.content,
-                "reactions": p.reactions,
-                "comments": p.comments,
-                "impressions": p.impressions,
-                "sentiment_label": p.sentiment_label,
-                "engagement_score": p.engagement_score,
-                "hashtags": p.hashtags,
-                "topics": p.topics,
-                "date_collected": p.date_collected.isoformat() if p.date_collected else None,
-            })
-        content = json.dumps(data, indent=2)
         return StreamingResponse(
-            io.BytesIO(content.encode()),
+            _export_json(rows),
             media_type="application/json",
             headers={"Content-Disposition": "attachment; filename=linkedin_posts.json"},
         )
 
-    # CSV format
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "post_id", "post_url", "author_name", "author_jobtitle", "content",
-        "reactions", "comments", "impressions", "sentiment_label",
-        "engagement_score", "hashtags", "topics", "date_collected",
-    ])
-    for p in posts:
-        writer.writerow([
-            p.post_id, p.post_url, p.author_name, p.author_jobtitle, p.content,
-            p.reactions, p.comments, p.impressions, p.sentiment_label,
-            p.engagement_score, p.hashtags, p.topics,
-            p.date_collected.isoformat() if p.date_collected else "",
-        ])
-
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
+        _export_csv(rows),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=linkedin_posts.csv"},
     )
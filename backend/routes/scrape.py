@@ -1,7 +1,9 @@
 import os
 from fastapi import APIRouter, HTTPException
-from schemas import ScrapeRequest, SearchScrapeRequest, ScrapeJobOut
-from services.scrape_service import start_scrape_job, start_search_job, get_job, get_all_jobs
+from schemas import ScrapeRequest, SearchScrapeRequest, ScrapeJobOut, BatchScrapeRequest, BatchScrapeJobOut
+from services.scrape_service import (
+    start_scrape_job, start_search_job, start_batch_scrape_job, get_job, get_all_jobs,
+)
 from config import COOKIE_FILE, load_credentials, has_auth
 
 router = APIRouter(prefix="/api/scrape", tags=["scrape"])
@@ -35,6 +37,30 @@ def start_scrape(req: ScrapeRequest):
     return {"job_id": job_id, **job}
 
 
+@router.post("/batch", response_model=BatchScrapeJobOut)
+def start_batch_scrape(req: BatchScrapeRequest):
+    if not any(u.strip() for u in req.profile_urls):
+        raise HTTPException(status_code=400, detail="At least one profile URL is required.")
+    cookie_path, email, password = _get_auth()
+    job_id = start_batch_scrape_job(
+        profile_urls=req.profile_urls,
+        max_posts=req.max_posts,
+        cookie_path=cookie_path,
+        email=email,
+        password=password,
+    )
+    job = get_job(job_id)
+    return {"job_id": job_id, **job}
+
+
+@router.get("/batch/{job_id}", response_model=BatchScrapeJobOut)
+def batch_scrape_status(job_id: str):
+    job = get_job(job_id)
+    if not job or "profiles" not in job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return {"job_id": job_id, **job}
+
+
 @router.post("/search", response_model=ScrapeJobOut)
 def start_search(req: SearchScrapeRequest):
     # Pass auth if available — enables native LinkedIn search via Selenium.
@@ -67,6 +93,13 @@ def scrape_history():
     return get_all_jobs()
 
 
+@router.get("/cache-stats")
+def cache_stats():
+    """Hit/miss counters for the DuckDuckGo response cache (since process start)."""
+    from services.ddg_cache import get_stats
+    return get_stats()
+
+
 @router.get("/{job_id}", response_model=ScrapeJobOut)
 def scrape_status(job_id: str):
     job = get_job(job_id)
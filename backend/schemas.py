@@ -56,6 +56,25 @@ class ScrapeJobOut(BaseModel):
     query: str | None = None
 
 
+class BatchScrapeRequest(BaseModel):
+    profile_urls: list[str]
+    max_posts: int = 20
+
+
+class ProfileScrapeProgress(BaseModel):
+    profile_url: str
+    status: str
+    posts_found: int
+    error: str | None = None
+
+
+class BatchScrapeJobOut(ScrapeJobOut):
+    profiles_total: int
+    profiles_done: int
+    profiles_failed: int
+    profiles: list[ProfileScrapeProgress]
+
+
 class CookieStatus(BaseModel):
     uploaded: bool
 
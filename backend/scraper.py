@@ -1,73 +1,38 @@
 """
 LinkedIn post scraper.
 - search_linkedin_posts: Uses DuckDuckGo (no account needed)
+- search_linkedin_posts_many: Concurrent DuckDuckGo search over many queries (scheduler)
+- iter_* variants yield batches of posts as they are found
 - scrape_linkedin_posts: Uses Selenium + login (for profile scraping, optional)
 """
 
 import re
 import time
 import hashlib
+import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Callable
+from typing import Callable, Iterator
 
 from ddgs import DDGS
 
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, WebDriverException
+from browser_pool import HAS_SELENIUM, IN_FLIGHT_COUNTER_JS, pool as browser_pool
+from config import DDG_MAX_CONCURRENCY
+from parsing import make_soup
+from replay import maybe_record
+from services.ddg_cache import cached_ddg_text
+from url_classifier import classifier as url_classifier
 
-    HAS_SELENIUM = True
-except ImportError:
-    HAS_SELENIUM = False
-
-from bs4 import BeautifulSoup as bs
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# Allowed URL patterns — only actual user content
+# URL filtering (rules live in url_classifier)
 # ---------------------------------------------------------------------------
-_POST_URL_PATTERNS = [
-    "/posts/",       # linkedin.com/posts/username_...
-    "/pulse/",       # linkedin.com/pulse/article-title
-    "/feed/update/", # linkedin.com/feed/update/urn:li:activity:...
-]
-
-_BLOCKED_DOMAINS = [
-    "business.linkedin.com",
-    "training.linkedin.com",
-    "news.linkedin.com",
-    "engineering.linkedin.com",
-    "learning.linkedin.com",
-    "ads.linkedin.com",
-    "developer.linkedin.com",
-]
-
-
-_BLOCKED_PATHS = [
-    "/advice/", "/help/", "/legal/",
-    "/jobs/", "/company/", "/school/", "/events/",
-    "/groups/", "/learning/", "/showcase/", "/newsletters/",
-]
-
-
 def _is_valid_post_url(url: str) -> bool:
     """Only allow actual LinkedIn user posts and articles."""
-    if any(domain in url for domain in _BLOCKED_DOMAINS):
-        return False
-    if any(path in url for path in _BLOCKED_PATHS):
-        return False
-    # Block query-string-only URLs (no meaningful path after domain)
-    if re.search(r'linkedin\.com/?\?', url):
-        return False
-    # Block /in/ profile-only URLs (without /posts/ or /activity/)
-    if "/in/" in url and not any(p in url for p in ["/posts/", "/activity/", "/pulse/"]):
-        return False
-    return any(pattern in url for pattern in _POST_URL_PATTERNS)
+    return url_classifier.is_valid(url)
 
 
 # ---------------------------------------------------------------------------
@@ -145,6 +110,56 @@ _LOCATION_LABELS = {
 }
 
 
+# DuckDuckGo returns at most this many results for a single query
+_DDG_MAX_RESULTS = 150
+
+
+def _build_search_query(query: str, site: str, location: str) -> str:
+    """Build a DDG query restricted to linkedin.com/posts, /pulse, or both ("all")."""
+    # Build location keyword to add to the search
+    location_keyword = ""
+    if location and location != "any":
+        location_keyword = _LOCATION_LABELS.get(location, location.replace("-", " ").title())
+
+    # Build targeted search query
+    loc_part = f' "{location_keyword}"' if location_keyword else ""
+    if site == "posts":
+        return f'site:linkedin.com/posts "{query}"{loc_part}'
+    elif site == "pulse":
+        return f'site:linkedin.com/pulse "{query}"{loc_part}'
+    return f'site:linkedin.com/posts OR site:linkedin.com/pulse "{query}"{loc_part}'
+
+
+# Process-wide cap on DDG requests in flight. Multi-query and sharded searches
+# nest thread pools; every request still takes one of these slots.
+_ddg_slots = threading.BoundedSemaphore(max(1, DDG_MAX_CONCURRENCY))
+
+
+def _fetch_ddg(search_query: str, time_range: str, region: str | None, fetch_count: int) -> list[dict]:
+    """Run one DDG text search (through the response cache) and return raw results."""
+    timelimit = _TIME_MAP.get(time_range)
+    fetch_count = min(fetch_count, _DDG_MAX_RESULTS)
+
+    ddgs_kwargs: dict = {"max_results": fetch_count}
+    if timelimit:
+        ddgs_kwargs["timelimit"] = timelimit
+    if region:
+        ddgs_kwargs["region"] = region
+
+    def fetch() -> list[dict]:
+        with _ddg_slots:
+            return list(DDGS().text(search_query, **ddgs_kwargs))
+
+    return cached_ddg_text(
+        search_query,
+        time_range=time_range,
+        timelimit=timelimit,
+        region=region,
+        max_results=fetch_count,
+        fetch=fetch,
+    )
+
+
 def search_linkedin_posts(
     query: str,
     max_posts: int = 20,
@@ -162,43 +177,249 @@ def search_linkedin_posts(
     time_range: "any", "day", "week", "month", "year"
     location: "any", US state slug, or country slug
     """
-    # Build location keyword to add to the search
-    location_keyword = ""
-    if location and location != "any":
-        location_keyword = _LOCATION_LABELS.get(location, location.replace("-", " ").title())
+    return [
+        post
+        for batch in iter_linkedin_posts(
+            query, max_posts, content_type, time_range, location, on_post_found
+        )
+        for post in batch
+    ]
 
-    # Build targeted search query
-    loc_part = f' "{location_keyword}"' if location_keyword else ""
-    if content_type == "posts":
-        search_query = f'site:linkedin.com/posts "{query}"{loc_part}'
-    elif content_type == "articles":
-        search_query = f'site:linkedin.com/pulse "{query}"{loc_part}'
-    else:
-        search_query = f'site:linkedin.com/posts OR site:linkedin.com/pulse "{query}"{loc_part}'
 
-    timelimit = _TIME_MAP.get(time_range)
-    region = _REGION_MAP.get(location) if location else None
+def iter_linkedin_posts(
+    query: str,
+    max_posts: int = 20,
+    content_type: str = "posts",
+    time_range: str = "any",
+    location: str = "any",
+    on_post_found: Callable[[int], None] | None = None,
+    batch_size: int = 10,
+) -> Iterator[list[dict]]:
+    """
+    Streaming variant of search_linkedin_posts: yields batches of up to
+    `batch_size` posts as they are parsed.
 
-    # Request extra results since we'll filter some out
-    fetch_count = min(max_posts * 3, 150)
+    content_type: "posts" (user posts), "articles" (pulse articles), "all"
+    time_range: "any", "day", "week", "month", "year"
+    location: "any", US state slug, or country slug
+    """
+    # Past the single-query ceiling, split the search into shards
+    if max_posts * 3 > _DDG_MAX_RESULTS:
+        yield from iter_linkedin_posts_sharded(
+            query, max_posts, content_type, time_range, location,
+            on_post_found=on_post_found, batch_size=batch_size,
+        )
+        return
 
-    ddgs_kwargs: dict = {"max_results": fetch_count}
-    if timelimit:
-        ddgs_kwargs["timelimit"] = timelimit
-    if region:
-        ddgs_kwargs["region"] = region
+    site = {"posts": "posts", "articles": "pulse"}.get(content_type, "all")
+    # Request extra results since we'll filter some out
+    raw_results = _fetch_ddg(
+        _build_search_query(query, site, location),
+        time_range,
+        _REGION_MAP.get(location) if location else None,
+        max_posts * 3,
+    )
 
-    results = []
-    for r in DDGS().text(search_query, **ddgs_kwargs):
+    found = 0
+    batch: list[dict] = []
+    for r in raw_results:
         result = _parse_ddg_result(r)
         if result:
-            results.append(result)
+            batch.append(result)
+            found += 1
             if on_post_found:
-                on_post_found(len(results))
-            if len(results) >= max_posts:
+                on_post_found(found)
+            if found >= max_posts:
                 break
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
 
-    return results
+def search_key(spec: dict) -> tuple:
+    """Hashable identity of a search_linkedin_posts_many query spec."""
+    return tuple(sorted(spec.items()))
+
+
+def search_linkedin_posts_many(
+    queries: list[str | dict],
+    max_posts: int = 20,
+    content_type: str = "posts",
+    time_range: str = "any",
+    location: str = "any",
+    max_workers: int = DDG_MAX_CONCURRENCY,
+    max_total_posts: int | None = None,
+    on_results: Callable[[dict, list[dict]], None] | None = None,
+    on_progress: Callable[[int, int, int], None] | None = None,
+) -> list[dict]:
+    """
+    Run several DuckDuckGo searches concurrently and merge the results.
+
+    Each query is a string or a dict of search_linkedin_posts arguments
+    ("query" plus any of max_posts, content_type, time_range, location);
+    the keyword arguments here are the defaults, so every query has its own
+    budget of `max_posts`. Identical queries run once. The returned list is
+    deduplicated across queries by post_id. As each query finishes,
+    `on_results(spec, posts)` receives its full spec dict and that query's
+    own results (deduplicated within the query only, so a post matched by
+    several queries reaches each of them), and `on_progress(queries_done,
+    queries_total, unique_posts)` is called. A query that raises is logged
+    and skipped, and `on_results` is not called for it; a query that found
+    nothing gets an empty list. DDG requests in flight never exceed DDG_MAX_CONCURRENCY,
+    including those of sharded queries.
+    """
+    defaults = {
+        "max_posts": max_posts, "content_type": content_type,
+        "time_range": time_range, "location": location,
+    }
+    specs: dict[tuple, dict] = {}
+    for q in queries:
+        spec = {**defaults, **(q if isinstance(q, dict) else {"query": q})}
+        if spec.get("query") and spec["query"].strip():
+            specs.setdefault(search_key(spec), spec)
+
+    seen_ids: set[str] = set()
+    merged: list[dict] = []
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(search_linkedin_posts, **spec): spec for spec in specs.values()}
+        for future in as_completed(futures):
+            spec = futures[future]
+            done += 1
+            try:
+                results = future.result()
+            except Exception:
+                logger.exception(f"DDG search failed for '{spec['query']}'")
+                if on_progress:
+                    on_progress(done, len(specs), len(merged))
+                continue
+
+            own_ids: set[str] = set()
+            own_posts = []
+            for post in results:
+                if post["post_id"] in own_ids:
+                    continue
+                own_ids.add(post["post_id"])
+                own_posts.append(post)
+                if post["post_id"] not in seen_ids:
+                    seen_ids.add(post["post_id"])
+                    merged.append(post)
+
+            if on_results:
+                on_results(spec, own_posts)
+            if on_progress:
+                on_progress(done, len(specs), len(merged))
+
+            if max_total_posts and len(merged) >= max_total_posts:
+                for f in futures:
+                    f.cancel()
+                break
+
+    return merged[:max_total_posts] if max_total_posts else merged
+
+
+# Time windows from broadest to narrowest; a shard never widens the requested range
+_TIME_WINDOWS = ["any", "year", "month", "week", "day"]
+
+# Regions tried when the search is not tied to a location
+_SHARD_REGIONS = [None, "us-en", "uk-en", "in-en", "ca-en", "au-en"]
+
+
+def plan_search_shards(
+    content_type: str = "posts",
+    time_range: str = "any",
+    location: str = "any",
+    max_shards: int = 24,
+) -> list[dict]:
+    """
+    Split one logical search into sub-queries across site filter, time window
+    and region. The first shard is always the unsharded query itself.
+    Returns dicts with "site", "time_range" and "region".
+    """
+    sites = {"posts": ["posts"], "articles": ["pulse"]}.get(content_type, ["posts", "pulse"])
+
+    start = _TIME_WINDOWS.index(time_range) if time_range in _TIME_WINDOWS else 0
+    windows = _TIME_WINDOWS[start:]
+
+    if location and location != "any":
+        regions = [_REGION_MAP.get(location)]
+    else:
+        regions = _SHARD_REGIONS
+
+    shards = []
+    if content_type not in ("posts", "articles"):
+        shards.append({"site": "all", "time_range": windows[0], "region": regions[0]})
+    for window in windows:
+        for region in regions:
+            for site in sites:
+                shards.append({"site": site, "time_range": window, "region": region})
+    return shards[:max_shards]
+
+
+def iter_linkedin_posts_sharded(
+    query: str,
+    max_posts: int = 200,
+    content_type: str = "posts",
+    time_range: str = "any",
+    location: str = "any",
+    max_shards: int = 24,
+    max_workers: int = DDG_MAX_CONCURRENCY,
+    on_post_found: Callable[[int], None] | None = None,
+    batch_size: int = 10,
+) -> Iterator[list[dict]]:
+    """
+    Run a search as concurrent DDG shards (see plan_search_shards) to get past
+    the per-query result cap. Yields batches of posts deduplicated by post_id
+    and stops once `max_posts` unique posts have been found.
+    """
+    shards = plan_search_shards(content_type, time_range, location, max_shards)
+    seen_ids: set[str] = set()
+    found = 0
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = [
+        executor.submit(
+            _fetch_ddg,
+            _build_search_query(query, shard["site"], location),
+            shard["time_range"],
+            shard["region"],
+            _DDG_MAX_RESULTS,
+        )
+        for shard in shards
+    ]
+    try:
+        for future in as_completed(futures):
+            try:
+                raw_results = future.result()
+            except Exception:
+                logger.exception(f"DDG shard failed for '{query}'")
+                continue
+
+            batch: list[dict] = []
+            for r in raw_results:
+                result = _parse_ddg_result(r)
+                if not result or result["post_id"] in seen_ids:
+                    continue
+                seen_ids.add(result["post_id"])
+                batch.append(result)
+                found += 1
+                if on_post_found:
+                    on_post_found(found)
+                if found >= max_posts or len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                if found >= max_posts:
+                    return
+            if batch:
+                yield batch
+    finally:
+        # Enough posts found (or caller stopped): drop shards not yet started
+        # and don't wait for in-flight ones
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def _activity_id_to_datetime(post_id: str) -> datetime | None:
@@ -440,6 +661,179 @@ def _parse_posts_from_soup(soup, unique_post_ids):
     return posts
 
 
+# JS run after each scroll: returns outerHTML for feed updates not yet collected
+# and tags them so later passes skip them. Nodes without an activity URN yet
+# (still hydrating) are left untagged so they are picked up on a later pass.
+_COLLECT_NEW_UPDATES_JS = """
+const out = [];
+document.querySelectorAll('div.feed-shared-update-v2:not([data-scrape-seen])').forEach(el => {
+    const urn = el.getAttribute('data-urn') || '';
+    const link = el.querySelector('a.update-components-mini-update-v2__link-to-details-page');
+    const href = link ? (link.getAttribute('href') || '') : '';
+    if (urn.indexOf('urn:li:activity:') === -1 && href.indexOf('urn:li:activity:') === -1) {
+        return;
+    }
+    el.setAttribute('data-scrape-seen', '1');
+    out.push(el.outerHTML);
+});
+return out;
+"""
+
+
+def _extract_feed_soup(browser, incremental: bool = True):
+    """Return a soup of feed updates to parse on this pass.
+
+    In incremental mode only updates that appeared since the previous pass are
+    pulled from the browser, instead of re-serializing the whole page.
+    """
+    if not incremental:
+        return make_soup(browser.page_source)
+    fragments = browser.execute_script(_COLLECT_NEW_UPDATES_JS) or []
+    return make_soup("".join(fragments))
+
+
+# Feed node count, number of network resources loaded so far, and fetch/XHR
+# requests still in flight. The resource timing buffer defaults to 250
+# entries, after which the count would stall.
+_FEED_STATE_JS = IN_FLIGHT_COUNTER_JS + """
+performance.setResourceTimingBufferSize(100000);
+return [
+    document.querySelectorAll('div.feed-shared-update-v2').length,
+    performance.getEntriesByType('resource').length,
+    window.__scrapeNet.pending,
+];
+"""
+
+_SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight);"
+
+# Upper bounds match the old fixed sleeps, so the worst case is unchanged
+_PAGE_LOAD_MAX_WAIT = 5.0
+_SCROLL_MAX_WAIT = 4.0
+
+
+class _AdaptiveWait:
+    """Waits for new feed content instead of sleeping a fixed time.
+
+    A wait ends as soon as the feed node count grows past its value when the
+    wait started, no request has been in flight for `idle_window` seconds, or
+    the timeout passes. Only scroll-triggered loads are timed; once a few have
+    been seen the timeout tracks 1.5x their p95, never below `min_wait`.
+    """
+
+    def __init__(
+        self,
+        max_wait: float = _SCROLL_MAX_WAIT,
+        min_wait: float = 1.0,
+        poll_interval: float = 0.2,
+        idle_window: float = 0.75,
+        history: int = 20,
+    ):
+        self.max_wait = max_wait
+        self.min_wait = min_wait
+        self.poll_interval = poll_interval
+        self.idle_window = idle_window
+        self.history = history
+        self.loads: list[float] = []
+        self.waits: list[float] = []
+
+    def timeout(self) -> float:
+        if len(self.loads) < 3:
+            return self.max_wait
+        recent = sorted(self.loads[-self.history:])
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+        return min(self.max_wait, max(self.min_wait, p95 * 1.5))
+
+    def scroll(self, browser) -> int:
+        """Scroll to the bottom and wait for the next page of updates.
+
+        The node count is read before scrolling, so updates that rendered
+        earlier neither end the wait nor count as a fast load.
+        """
+        baseline = browser.execute_script(_FEED_STATE_JS)[0]
+        browser.execute_script(_SCROLL_JS)
+        return self.wait(browser, baseline)
+
+    def wait(self, browser, baseline: int, max_wait: float | None = None, learn: bool = True) -> int:
+        """Block until the node count exceeds `baseline` or the page is idle.
+        Returns the current feed node count. Pass learn=False for waits that
+        are not a scroll load (e.g. the initial page load)."""
+        start = time.monotonic()
+        deadline = start + (max_wait if max_wait is not None else self.timeout())
+        last_resources = None
+        idle_since = start
+        count = baseline
+
+        while True:
+            count, resources, pending = browser.execute_script(_FEED_STATE_JS)
+            now = time.monotonic()
+            if count > baseline:
+                if learn:
+                    self.loads.append(now - start)
+                break
+            if pending or resources != last_resources:
+                last_resources = resources
+                idle_since = now
+            elif now - idle_since >= self.idle_window and now - start >= self.min_wait:
+                break
+            if now >= deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        self.waits.append(time.monotonic() - start)
+        return count
+
+
+def _iter_scroll_batches(
+    browser,
+    max_posts: int,
+    max_scroll_attempts: int,
+    max_no_new_posts: int,
+    on_post_found: Callable[[int], None] | None = None,
+    incremental: bool = True,
+    waiter: _AdaptiveWait | None = None,
+) -> Iterator[list[dict]]:
+    """Scroll the current feed page, yielding each pass's new posts until a stop condition is hit."""
+    unique_post_ids: set[str] = set()
+    total = 0
+    scroll_attempts = 0
+    no_new_posts_count = 0
+
+    waiter = waiter or _AdaptiveWait()
+    waiter.wait(browser, 0, max_wait=_PAGE_LOAD_MAX_WAIT, learn=False)
+
+    while (
+        total < max_posts
+        and scroll_attempts < max_scroll_attempts
+        and no_new_posts_count < max_no_new_posts
+    ):
+        soup = _extract_feed_soup(browser, incremental)
+        new_posts = _parse_posts_from_soup(soup, unique_post_ids)
+
+        if not new_posts:
+            no_new_posts_count += 1
+        else:
+            no_new_posts_count = 0
+            new_posts = new_posts[:max_posts - total]
+            total += len(new_posts)
+            if on_post_found:
+                on_post_found(total)
+            yield new_posts
+
+        if total >= max_posts:
+            break
+
+        waiter.scroll(browser)
+        scroll_attempts += 1
+        logger.debug(f"Scroll {scroll_attempts}: waited {waiter.waits[-1]:.2f}s")
+
+    if waiter.waits:
+        logger.info(
+            f"Collected {total} posts in {scroll_attempts} scrolls, "
+            f"waited {sum(waiter.waits):.1f}s total "
+            f"(avg {sum(waiter.waits) / len(waiter.waits):.2f}s per wait)"
+        )
+
+
 # ---------------------------------------------------------------------------
 # Selenium-based LinkedIn native search (requires login)
 # ---------------------------------------------------------------------------
@@ -455,12 +849,42 @@ def search_linkedin_native(
     max_scroll_attempts: int = 40,
     max_no_new_posts: int = 3,
     on_post_found: Callable[[int], None] | None = None,
+    incremental: bool = True,
 ) -> list[dict]:
     """
     Search LinkedIn directly via Selenium for better results and real engagement data.
     Requires Selenium and a LinkedIn login.
     Falls back caller should catch exceptions and fall back to DDG.
     """
+    return [
+        post
+        for batch in iter_linkedin_native(
+            query, max_posts, content_type, time_range, location,
+            cookie_path, email, password, max_scroll_attempts, max_no_new_posts,
+            on_post_found, incremental,
+        )
+        for post in batch
+    ]
+
+
+def iter_linkedin_native(
+    query: str,
+    max_posts: int = 20,
+    content_type: str = "posts",
+    time_range: str = "any",
+    location: str = "any",
+    cookie_path: str | None = None,
+    email: str | None = None,
+    password: str | None = None,
+    max_scroll_attempts: int = 40,
+    max_no_new_posts: int = 3,
+    on_post_found: Callable[[int], None] | None = None,
+    incremental: bool = True,
+) -> Iterator[list[dict]]:
+    """
+    Streaming variant of search_linkedin_native: yields the new posts found
+    on each scroll pass. The browser stays leased until the iterator finishes.
+    """
     if not HAS_SELENIUM:
         raise RuntimeError("Selenium is not installed.")
 
@@ -469,42 +893,8 @@ def search_linkedin_native(
 
     from urllib.parse import quote_plus
 
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    browser = webdriver.Chrome(options=chrome_options)
-    browser.set_window_size(1920, 1080)
-
-    try:
-        # --- Login (reuse existing flow) ---
-        if email and password:
-            browser.get("https://www.linkedin.com/login")
-            time.sleep(2)
-            email_field = WebDriverWait(browser, 10).until(
-                EC.presence_of_element_located((By.ID, "username"))
-            )
-            email_field.clear()
-            email_field.send_keys(email)
-            password_field = browser.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-            password_field.submit()
-            time.sleep(3)
-        elif cookie_path:
-            browser.get("https://www.linkedin.com/")
-            time.sleep(2)
-            from scraper import load_cookies
-            load_cookies(browser, cookie_path)
-            browser.refresh()
-
-        try:
-            WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#global-nav"))
-            )
-        except TimeoutException:
-            raise RuntimeError("Login failed — check your credentials.")
-
+    # Leased driver is already logged in (warm from the pool or freshly launched)
+    with browser_pool.lease(cookie_path, email, password) as browser:
         # --- Build search URL ---
         encoded_query = quote_plus(query)
         date_param = _LINKEDIN_DATE_MAP.get(time_range, "")
@@ -513,42 +903,16 @@ def search_linkedin_native(
             url += f"&datePosted={date_param}"
 
         browser.get(url)
-        time.sleep(5)
 
         # --- Scroll and parse (same pattern as scrape_linkedin_posts) ---
-        unique_post_ids: set[str] = set()
-        all_posts: list[dict] = []
-        scroll_attempts = 0
-        no_new_posts_count = 0
-
-        while (
-            len(all_posts) < max_posts
-            and scroll_attempts < max_scroll_attempts
-            and no_new_posts_count < max_no_new_posts
-        ):
-            soup = bs(browser.page_source, "html.parser")
-            new_posts = _parse_posts_from_soup(soup, unique_post_ids)
-
-            if not new_posts:
-                no_new_posts_count += 1
-            else:
-                no_new_posts_count = 0
-                all_posts.extend(new_posts)
-                if on_post_found:
-                    on_post_found(len(all_posts))
-
-            if len(all_posts) >= max_posts:
-                all_posts = all_posts[:max_posts]
-                break
-
-            browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(4)
-            scroll_attempts += 1
-
-        return all_posts
-
-    finally:
-        browser.quit()
+        yield from _iter_scroll_batches(
+            maybe_record(browser, "search"),
+            max_posts=max_posts,
+            max_scroll_attempts=max_scroll_attempts,
+            max_no_new_posts=max_no_new_posts,
+            on_post_found=on_post_found,
+            incremental=incremental,
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -563,11 +927,37 @@ def scrape_linkedin_posts(
     max_scroll_attempts: int = 40,
     max_no_new_posts: int = 3,
     on_post_found: Callable[[int], None] | None = None,
+    incremental: bool = True,
 ) -> list[dict]:
     """
     Scrape LinkedIn posts from a user's activity page.
     Requires Selenium and a LinkedIn login.
     """
+    return [
+        post
+        for batch in iter_profile_posts(
+            profile_url, max_posts, cookie_path, email, password,
+            max_scroll_attempts, max_no_new_posts, on_post_found, incremental,
+        )
+        for post in batch
+    ]
+
+
+def iter_profile_posts(
+    profile_url: str,
+    max_posts: int = 20,
+    cookie_path: str | None = None,
+    email: str | None = None,
+    password: str | None = None,
+    max_scroll_attempts: int = 40,
+    max_no_new_posts: int = 3,
+    on_post_found: Callable[[int], None] | None = None,
+    incremental: bool = True,
+) -> Iterator[list[dict]]:
+    """
+    Streaming variant of scrape_linkedin_posts: yields the new posts found
+    on each scroll pass. The browser stays leased until the iterator finishes.
+    """
     if not HAS_SELENIUM:
         raise RuntimeError("Selenium is not installed. Profile scraping requires Selenium.")
 
@@ -577,74 +967,14 @@ def scrape_linkedin_posts(
     if "/recent-activity/" not in profile_url:
         profile_url = profile_url.rstrip("/") + "/recent-activity/all/"
 
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    browser = webdriver.Chrome(options=chrome_options)
-    browser.set_window_size(1920, 1080)
-
-    try:
-        if email and password:
-            browser.get("https://www.linkedin.com/login")
-            time.sleep(2)
-            email_field = WebDriverWait(browser, 10).until(
-                EC.presence_of_element_located((By.ID, "username"))
-            )
-            email_field.clear()
-            email_field.send_keys(email)
-            password_field = browser.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-            password_field.submit()
-            time.sleep(3)
-        elif cookie_path:
-            browser.get("https://www.linkedin.com/")
-            time.sleep(2)
-            from scraper import load_cookies
-            load_cookies(browser, cookie_path)
-            browser.refresh()
-
-        try:
-            WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#global-nav"))
-            )
-        except TimeoutException:
-            raise RuntimeError("Login failed — check your credentials.")
-
+    with browser_pool.lease(cookie_path, email, password) as browser:
         browser.get(profile_url)
-        time.sleep(5)
-
-        unique_post_ids: set[str] = set()
-        all_posts: list[dict] = []
-        scroll_attempts = 0
-        no_new_posts_count = 0
-
-        while (
-            len(all_posts) < max_posts
-            and scroll_attempts < max_scroll_attempts
-            and no_new_posts_count < max_no_new_posts
-        ):
-            soup = bs(browser.page_source, "html.parser")
-            new_posts = _parse_posts_from_soup(soup, unique_post_ids)
-
-            if not new_posts:
-                no_new_posts_count += 1
-            else:
-                no_new_posts_count = 0
-                all_posts.extend(new_posts)
-                if on_post_found:
-                    on_post_found(len(all_posts))
 
-            if len(all_posts) >= max_posts:
-                all_posts = all_posts[:max_posts]
-                break
-
-            browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(4)
-            scroll_attempts += 1
-
-        return all_posts
-
-    finally:
-        browser.quit()
+        yield from _iter_scroll_batches(
+            maybe_record(browser, "profile"),
+            max_posts=max_posts,
+            max_scroll_attempts=max_scroll_attempts,
+            max_no_new_posts=max_no_new_posts,
+            on_post_found=on_post_found,
+            incremental=incremental,
+        )
@@ -1,122 +1,316 @@
-import re
 import json
-from textblob import TextBlob
+import hashlib
+import logging
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Callable
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import or_
+from config import ENRICH_COMMIT_CHUNK, ANALYSIS_WORKERS, ANALYSIS_LEASE_MINUTES, SENTIMENT_ENGINE
+from db_chunks import (
+    iter_keyset, bulk_update, get_checkpoint, set_checkpoint, clear_checkpoint,
+    run_progress, acquire_lease, renew_lease, release_lease,
+)
 from models import Post
+from services.analysis_worker import score_texts
+from services.topic_engine import get_engine
+from services.engagement_stats import scores as engagement_scores, refresh as refresh_engagement
 
+logger = logging.getLogger(__name__)
 
-def analyze_sentiment(text: str) -> tuple[float, str]:
-    blob = TextBlob(text)
-    score = blob.sentiment.polarity
-    if score > 0.1:
-        label = "positive"
-    elif score < -0.1:
-        label = "negative"
-    else:
-        label = "neutral"
-    return score, label
+# Below this many texts a batch is scored inline; process hand-off costs more
+_MIN_PARALLEL_TEXTS = 64
 
+# Bump when sentiment/topic/hashtag logic changes: stored results carry the
+# version they were computed with, and stale posts are re-analyzed at startup
+_ANALYZER_REVISION = 2
+ANALYSIS_VERSION = f"{_ANALYZER_REVISION}-{SENTIMENT_ENGINE}"
 
-def extract_topics(text: str, n: int = 5) -> list[str]:
-    try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        # Use TF-IDF on the single document split into sentences
-        sentences = re.split(r'[.!?\n]+', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
-        if not sentences:
-            return []
-
-        vectorizer = TfidfVectorizer(
-            max_features=50,
-            stop_words='english',
-            ngram_range=(1, 2),
-            min_df=1,
-        )
-        tfidf = vectorizer.fit_transform(sentences)
-        feature_names = vectorizer.get_feature_names_out()
 
-        # Sum TF-IDF scores across sentences
-        scores = tfidf.sum(axis=0).A1
-        top_indices = scores.argsort()[-n:][::-1]
-        return [feature_names[i] for i in top_indices if scores[i] > 0]
-    except Exception:
-        return []
+# ---------------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------------
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
 
 
-def extract_hashtags(text: str) -> list[str]:
-    return re.findall(r'#(\w+)', text)
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if ANALYSIS_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs server and worker threads is unsafe
+            _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=get_context("spawn"))
+        return _pool
 
 
-def compute_engagement_score(reactions: int, comments: int, max_engagement: float) -> float:
-    raw = reactions * 1 + comments * 2
-    if max_engagement <= 0:
-        return 0.0
-    return min(round((raw / max_engagement) * 100, 1), 100.0)
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
 
 
-def enrich_posts(job_id: str, db: Session):
-    posts = db.query(Post).filter(Post.scrape_job_id == job_id).all()
-    if not posts:
-        return
+def _submit_scoring(texts: list[str]) -> Callable[[], list]:
+    """Start sentiment/hashtag scoring; returns a function that waits for the results."""
+    pool = _get_pool()
+    if pool is None or len(texts) < _MIN_PARALLEL_TEXTS:
+        return lambda: score_texts(texts, SENTIMENT_ENGINE)
+
+    size = -(-len(texts) // ANALYSIS_WORKERS)
+    futures = [
+        pool.submit(score_texts, texts[i:i + size], SENTIMENT_ENGINE)
+        for i in range(0, len(texts), size)
+    ]
+
+    def collect():
+        try:
+            return [result for future in futures for result in future.result()]
+        except BrokenProcessPool:
+            logger.exception("Analysis process pool died, scoring inline")
+            shutdown_pool()
+            return score_texts(texts, SENTIMENT_ENGINE)
+
+    return collect
+
+
+# ---------------------------------------------------------------------------
+# Batch analysis
+# ---------------------------------------------------------------------------
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
 
-    # Compute max engagement for normalization
-    max_eng = max((p.reactions + p.comments * 2) for p in posts) if posts else 1
-    if max_eng == 0:
-        max_eng = 1
+def _start_batch(rows: list, learn: list[bool] | bool = True):
+    """Start analyzing rows (anything with id, content, reactions, comments,
+    content_hash and analysis_version).
 
-    for post in posts:
-        text = post.content or ""
-        if not text.strip():
+    Rows whose content hash and analysis version match what was stored are
+    not re-analyzed; only their engagement score is refreshed. Sentiment for
+    the rest runs in the process pool while the caller carries on; pass the
+    return value to _finish_batch. Rows without text are skipped.
+    """
+    if isinstance(learn, bool):
+        learn = [learn] * len(rows)
+    batch, unchanged = [], []
+    for row, is_new in zip(rows, learn):
+        if not (row.content or "").strip():
             continue
+        digest = content_hash(row.content)
+        if digest == row.content_hash and row.analysis_version == ANALYSIS_VERSION:
+            unchanged.append(row)
+        else:
+            batch.append((row, is_new, digest))
+    collect = _submit_scoring([row.content for row, _, _ in batch])
+    return batch, unchanged, collect
 
-        score, label = analyze_sentiment(text)
-        post.sentiment = score
-        post.sentiment_label = label
 
-        topics = extract_topics(text)
-        post.topics = json.dumps(topics)
+def _finish_batch(db: Session, started) -> tuple[list[dict], int]:
+    """Topics for the whole batch, plus the pool's sentiment results, as update
+    mappings. Returns (mappings, number of posts analyzed). Commit soon after:
+    engagement scoring holds the database write lock until then.
+    """
+    batch, unchanged, collect = started
+    texts = [row.content for row, _, _ in batch]
+    all_topics = []
+    if batch:
+        try:
+            all_topics = get_engine().extract_topics_batch(texts, learn=[is_new for _, is_new, _ in batch])
+        except Exception:
+            logger.exception("Topic extraction failed")
+            all_topics = [[] for _ in batch]
+    sentiments = collect()
 
-        hashtags = extract_hashtags(text)
-        post.hashtags = ",".join(hashtags) if hashtags else None
+    rows = unchanged + [row for row, _, _ in batch]
+    engagement = engagement_scores(db, [r.reactions for r in rows], [r.comments for r in rows])
+    mappings = [
+        {"id": row.id, "engagement_score": float(score)}
+        for row, score in zip(unchanged, engagement)
+    ]
+    results = zip(batch, all_topics, sentiments, engagement[len(unchanged):])
+    for (row, _, digest), topics, (score, label, hashtags), engagement_score in results:
+        mappings.append({
+            "id": row.id,
+            "sentiment": score,
+            "sentiment_label": label,
+            "topics": json.dumps(topics),
+            "hashtags": ",".join(hashtags) if hashtags else None,
+            "engagement_score": float(engagement_score),
+            "content_hash": digest,
+            "analysis_version": ANALYSIS_VERSION,
+        })
+    return mappings, len(batch)
 
-        post.engagement_score = compute_engagement_score(
-            post.reactions or 0, post.comments or 0, max_eng
-        )
 
-    db.commit()
+# Columns the analysis reads; passes load these instead of full Post objects
+_ANALYSIS_COLUMNS = (
+    Post.id, Post.content, Post.reactions, Post.comments,
+    Post.sentiment, Post.content_hash, Post.analysis_version,
+)
 
 
-def enrich_all_posts(db: Session):
-    """Enrich all posts that haven't been analyzed yet."""
-    posts = db.query(Post).filter(Post.sentiment.is_(None)).all()
-    if not posts:
-        return 0
+def _needs_analysis():
+    """Never analyzed, or analyzed by an older analyzer version."""
+    return or_(
+        Post.sentiment.is_(None),
+        Post.analysis_version.is_(None),
+        Post.analysis_version != ANALYSIS_VERSION,
+    )
 
-    max_result = db.query(
-        func.max(Post.reactions + Post.comments * 2)
-    ).scalar() or 1
 
-    count = 0
-    for post in posts:
-        text = post.content or ""
-        if not text.strip():
-            continue
+def enrich_posts(job_id: str, db: Session):
+    job_posts = db.query(*_ANALYSIS_COLUMNS).filter(Post.scrape_job_id == job_id)
 
-        score, label = analyze_sentiment(text)
-        post.sentiment = score
-        post.sentiment_label = label
+    for rows in iter_keyset(job_posts, Post.id, ENRICH_COMMIT_CHUNK):
+        # Posts analyzed before are already counted in the corpus frequencies
+        started = _start_batch(rows, learn=[r.sentiment is None for r in rows])
+        mappings, _ = _finish_batch(db, started)
+        bulk_update(db, Post, mappings)
+        db.commit()
+    get_engine().save()
+    refresh_engagement(db)
 
-        topics = extract_topics(text)
-        post.topics = json.dumps(topics)
 
-        hashtags = extract_hashtags(text)
-        post.hashtags = ",".join(hashtags) if hashtags else None
+_PASS = "enrich_all_posts"
+
+
+def get_enrich_progress() -> dict:
+    """Progress of the full analysis pass, whichever web worker runs it."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        progress = run_progress(db, _PASS)
+    finally:
+        db.close()
+    progress["enriched"] = progress.pop("succeeded")
+    return progress
+
+
+def start_enrich_all() -> dict:
+    """Run enrich_all_posts in a background thread unless a web worker is
+    already running it. Returns the pass's progress.
+    """
+    _start_enrich_all()
+    return get_enrich_progress()
 
-        post.engagement_score = compute_engagement_score(
-            post.reactions or 0, post.comments or 0, max_result
-        )
-        count += 1
 
+def _start_enrich_all() -> bool:
+    """Take the pass lease and start the pass. False if another process holds it."""
+    from database import SessionLocal
+
+    owner = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        if not acquire_lease(db, _PASS, owner, ANALYSIS_LEASE_MINUTES):
+            return False
+    finally:
+        db.close()
+
+    def _run():
+        db = SessionLocal()
+        try:
+            enrich_all_posts(db, owner)
+            status, error = "completed", None
+        except Exception as e:
+            logger.exception("Analysis pass failed")
+            db.rollback()
+            status, error = "failed", str(e)
+        try:
+            release_lease(db, _PASS, owner, status, error)
+        finally:
+            db.close()
+
+    threading.Thread(target=_run, daemon=True).start()
+    return True
+
+
+def enrich_all_posts(db: Session, owner: str):
+    """Enrich all posts that haven't been analyzed yet, or were analyzed by an
+    older ANALYSIS_VERSION. `owner` must hold the pass lease (see
+    _start_enrich_all); the pass stops if it loses it.
+
+    Sentiment for the next chunk is scored in the process pool while the
+    current chunk's topics are computed and written. Commits every
+    ENRICH_COMMIT_CHUNK posts; an interrupted pass resumes after the last
+    committed post.
+    """
+    pending = db.query(*_ANALYSIS_COLUMNS).filter(_needs_analysis())
+
+    checkpoint = get_checkpoint(db, _PASS)
+    after = checkpoint.last_key if checkpoint else None
+    count = checkpoint.processed if checkpoint else 0
+    processed = 0
+    remaining = pending if after is None else pending.filter(Post.id > after)
+    renew_lease(db, _PASS, owner, ANALYSIS_LEASE_MINUTES, total=remaining.count(), succeeded=count)
+    db.commit()
+
+    def commit(rows, started):
+        nonlocal count, processed
+        mappings, analyzed = _finish_batch(db, started)
+        bulk_update(db, Post, mappings)
+        count += analyzed
+        processed += len(rows)
+        set_checkpoint(db, _PASS, rows[-1].id, count)
+        if not renew_lease(db, _PASS, owner, ANALYSIS_LEASE_MINUTES, processed=processed, succeeded=count):
+            db.rollback()
+            raise RuntimeError("Analysis pass lease expired and was taken over by another process")
+        db.commit()
+        # Posts past the checkpoint are not learned again after a restart
+        get_engine().save_if_due()
+        logger.info(f"Analyzed {count} posts (through id {rows[-1].id})")
+
+    in_flight = None
+    for rows in iter_keyset(pending, Post.id, ENRICH_COMMIT_CHUNK, after=after):
+        started = _start_batch(rows, learn=[r.sentiment is None for r in rows])
+        if in_flight:
+            commit(*in_flight)
+        in_flight = (rows, started)
+    if in_flight:
+        commit(*in_flight)
+
+    clear_checkpoint(db, _PASS)
     db.commit()
+    get_engine().save()
+    refresh_engagement(db)
     return count
+
+
+def analyze_posts(posts: list[Post], db: Session):
+    """Re-analyze specific posts (e.g. after their content was fetched). Caller commits."""
+    mappings, _ = _finish_batch(db, _start_batch(posts, learn=False))
+    bulk_update(db, Post, mappings)
+
+
+def reanalyze_if_stale():
+    """Start a background re-analysis when posts were analyzed by an older version.
+
+    Every web worker calls this at startup; the pass lease lets only one of
+    them run it, so stale and unanalyzed posts are not analyzed (and learned
+    into the topic frequencies) once per worker.
+    """
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stale = (
+            db.query(Post.id)
+            .filter(
+                Post.sentiment.isnot(None),
+                or_(Post.analysis_version.is_(None), Post.analysis_version != ANALYSIS_VERSION),
+            )
+            .first()
+        )
+    finally:
+        db.close()
+    if not stale:
+        return
+    if _start_enrich_all():
+        logger.info(f"Posts analyzed by an older analyzer version; re-analyzing as {ANALYSIS_VERSION}")
+    else:
+        logger.info("Re-analysis already running in another worker")
@@ -0,0 +1,43 @@
+"""
+Per-text analysis that runs in the analysis process pool.
+
+Kept free of database and app imports so spawned worker processes start
+quickly and hold nothing but the sentiment model.
+"""
+
+import re
+
+from textblob import TextBlob
+
+
+def analyze_sentiment(text: str) -> tuple[float, str]:
+    blob = TextBlob(text)
+    score = blob.sentiment.polarity
+    if score > 0.1:
+        label = "positive"
+    elif score < -0.1:
+        label = "negative"
+    else:
+        label = "neutral"
+    return score, label
+
+
+def extract_hashtags(text: str) -> list[str]:
+    return re.findall(r'#(\w+)', text)
+
+
+def score_texts(texts: list[str], engine: str = "textblob") -> list[tuple[float, str, list[str]]]:
+    """(sentiment, label, hashtags) for each text.
+
+    engine "lexicon" scores the whole list at once with the batch scorer in
+    services/sentiment_engine.py; "textblob" runs TextBlob per text.
+    """
+    if engine == "lexicon":
+        from services.sentiment_engine import get_scorer
+        sentiments = get_scorer().score_batch(texts)
+    else:
+        sentiments = [analyze_sentiment(text) for text in texts]
+    return [
+        (score, label, extract_hashtags(text))
+        for text, (score, label) in zip(texts, sentiments)
+    ]
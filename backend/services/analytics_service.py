@@ -71,29 +71,27 @@ def get_trending_topics(db: Session, limit: int = 20) -> list[dict]:
 
 def get_engagement_over_time(db: Session, days: int = 30) -> list[dict]:
     cutoff = datetime.utcnow() - timedelta(days=days)
-    posts = (
-        db.query(Post)
+    # Aggregated per day in SQL; only one row per day reaches Python
+    day = func.date(Post.date_collected)
+    rows = (
+        db.query(
+            day.label("day"),
+            func.avg(func.coalesce(Post.engagement_score, 0)).label("avg_engagement"),
+            func.count(Post.id).label("post_count"),
+        )
         .filter(Post.date_collected >= cutoff)
-        .order_by(Post.date_collected)
+        .group_by(day)
+        .order_by(day)
         .all()
     )
 
-    daily: dict[str, list[float]] = {}
-    for p in posts:
-        if not p.date_collected:
-            continue
-        day = p.date_collected.strftime("%Y-%m-%d")
-        if day not in daily:
-            daily[day] = []
-        daily[day].append(p.engagement_score or 0)
-
     return [
         {
-            "date": day,
-            "avg_engagement": round(sum(scores) / len(scores), 1),
-            "post_count": len(scores),
+            "date": r.day,
+            "avg_engagement": round(r.avg_engagement, 1),
+            "post_count": r.post_count,
         }
-        for day, scores in sorted(daily.items())
+        for r in rows
     ]
 
 
@@ -1,14 +1,26 @@
 """Fetch full post content from LinkedIn public pages to enrich DDG snippets."""
 
-import json
 import time
+import uuid
+import random
 import logging
+import threading
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 
+import http_client
+
+from config import ENRICH_HOST_RATE, ENRICH_MAX_RETRIES, ENRICH_COMMIT_CHUNK, ANALYSIS_LEASE_MINUTES
+from db_chunks import (
+    iter_keyset, get_checkpoint, set_checkpoint, clear_checkpoint,
+    run_progress, acquire_lease, renew_lease, release_lease,
+)
 from models import Post
+from services import html_cache
+from services.post_meta import extract_post_fields, extract_streaming
+from services.engagement_stats import raw_engagement, replace as replace_engagement, refresh as refresh_engagement
 
 logger = logging.getLogger(__name__)
 
@@ -21,199 +33,274 @@ _HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.9",
 }
+# Accept-Encoding and keep-alive come from the shared http_client session
 
 
-def fetch_post_content(post_url: str) -> dict | None:
-    """Fetch a LinkedIn post page and extract richer metadata.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-    Returns a dict with any of: content, reactions, comments,
-    author_name, author_jobtitle. Returns None on failure.
+
+class _TokenBucket:
+    """Allows `rate` requests per second on average, with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets: dict[str, _TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket_for(url: str) -> _TokenBucket:
+    host = urlsplit(url).hostname or ""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = _TokenBucket(ENRICH_HOST_RATE, burst=2)
+        return bucket
+
+
+def _get_with_retry(url: str, extra_headers: dict | None = None) -> requests.Response | None:
+    """GET under the per-host rate limit, retrying 429/5xx with jittered backoff.
+
+    The body is streamed: callers read it with http_client.iter_text() or close it.
     """
-    try:
-        resp = requests.get(post_url, headers=_HEADERS, timeout=10)
-        if resp.status_code != 200:
+    headers = {**_HEADERS, **extra_headers} if extra_headers else _HEADERS
+    for attempt in range(ENRICH_MAX_RETRIES + 1):
+        _bucket_for(url).acquire()
+        try:
+            resp = http_client.get(url, headers=headers, stream=True)
+        except requests.RequestException:
+            resp = None
+        if resp is not None and resp.status_code not in _RETRY_STATUSES:
+            return resp
+        if resp is not None:
+            resp.close()
+        if attempt == ENRICH_MAX_RETRIES:
+            break
+
+        delay = min(2 ** attempt, 30) * random.uniform(0.5, 1.5)
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+    return None
+
+
+def _fetch_fields(post_url: str) -> dict | None:
+    """Fetch and extract a post page via the raw HTML cache.
+
+    Cached bodies are revalidated with the server; a 304 re-extracts from
+    the cache. Fresh pages are parsed while streaming and reading stops once
+    the post's metadata is found; the part that was read is cached, flagged
+    as partial, and re-extracts to the same fields offline.
+    """
+    entry = html_cache.lookup(post_url)
+    if html_cache.is_known_failure(entry):
+        return None
+
+    resp = _get_with_retry(post_url, html_cache.conditional_headers(entry))
+    if resp is None:
+        # Network error or retries exhausted: fall back to the cached copy, if any
+        html = html_cache.read_body(entry)
+        return extract_post_fields(html) if html is not None else None
+
+    if resp.status_code == 304:
+        resp.close()
+        html = html_cache.read_body(entry)
+        if html is not None:
+            html_cache.touch(post_url, entry)
+            return extract_post_fields(html)
+        # Body was evicted under us; fetch it unconditionally
+        resp = _get_with_retry(post_url)
+        if resp is None:
             return None
-    except Exception:
+
+    if resp.status_code != 200:
+        resp.close()
+        html_cache.store_failure(post_url, resp.status_code)
         return None
 
+    chunks = http_client.iter_text(resp)
     try:
-        soup = BeautifulSoup(resp.text, "html.parser")
-    except Exception:
-        return None
+        result, html, complete = extract_streaming(chunks)
+    finally:
+        chunks.close()
+
+    html_cache.store(
+        post_url, html,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+        partial=not complete,
+    )
+    return result
 
-    result: dict = {}
 
-    # Extract og:description — typically longer than DDG snippet
-    og_desc = soup.find("meta", property="og:description")
-    if og_desc and og_desc.get("content"):
-        result["content"] = og_desc["content"].strip()
+def fetch_post_content(post_url: str, offline: bool = False) -> dict | None:
+    """Fetch a LinkedIn post page and extract richer metadata.
 
-    # Extract og:title — may include author name
-    og_title = soup.find("meta", property="og:title")
-    if og_title and og_title.get("content"):
-        title_text = og_title["content"].strip()
-        if " on LinkedIn:" in title_text:
-            parts = title_text.split(" on LinkedIn:", 1)
-            result["author_name"] = parts[0].strip()
+    Returns a dict with any of: content, reactions, comments,
+    author_name, author_jobtitle. Returns None on failure.
+    With offline=True only the raw HTML cache is read (no network).
+    """
+    if not offline:
+        return _fetch_fields(post_url)
+    html = html_cache.read_body(html_cache.lookup(post_url))
+    return extract_post_fields(html) if html is not None else None
 
-    # Extract <meta name="author">
-    meta_author = soup.find("meta", attrs={"name": "author"})
-    if meta_author and meta_author.get("content"):
-        result["author_name"] = meta_author["content"].strip()
 
-    # Look for JSON-LD structured data
-    for script in soup.find_all("script", type="application/ld+json"):
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, dict):
-                _extract_jsonld(data, result)
-            elif isinstance(data, list):
-                for item in data:
-                    if isinstance(item, dict):
-                        _extract_jsonld(item, result)
-        except (json.JSONDecodeError, TypeError):
-            continue
-
-    return result if result else None
-
-
-def _extract_jsonld(data: dict, result: dict):
-    """Extract useful fields from a JSON-LD object."""
-    # Author info
-    author = data.get("author")
-    if isinstance(author, dict):
-        if author.get("name"):
-            result["author_name"] = author["name"]
-        if author.get("jobTitle"):
-            result["author_jobtitle"] = author["jobTitle"]
-
-    # Interaction statistics
-    stats = data.get("interactionStatistic")
-    if isinstance(stats, list):
-        for stat in stats:
-            if not isinstance(stat, dict):
-                continue
-            itype = stat.get("interactionType", "")
-            count = stat.get("userInteractionCount", 0)
-            try:
-                count = int(count)
-            except (ValueError, TypeError):
-                continue
-            if "Like" in itype or "React" in itype:
-                result["reactions"] = count
-            elif "Comment" in itype:
-                result["comments"] = count
-
-    # Article body text
-    if data.get("articleBody"):
-        body = data["articleBody"].strip()
-        if len(body) > len(result.get("content", "")):
-            result["content"] = body
-
-
-def enrich_posts_with_content(job_id: str, db: Session):
-    """Fetch full content for posts that have truncated data or 0 engagement."""
-    posts = (
-        db.query(Post)
-        .filter(Post.scrape_job_id == job_id)
-        .all()
-    )
+def apply_fetched(post: Post, data: dict, replace_content: bool = False) -> bool:
+    """Copy fetched fields onto the post where they improve it. Returns True if changed.
 
-    enriched = 0
+    With replace_content, extracted content replaces the post's even when
+    shorter (re-extraction after the extraction rules changed).
+    """
+    content_len = len(post.content or "")
+    old_engagement = raw_engagement(post.reactions, post.comments)
+    updated = False
+
+    # Update content if fetched version is longer
+    if data.get("content") and data["content"] != post.content and (
+        replace_content or len(data["content"]) > content_len
+    ):
+        post.content = data["content"]
+        updated = True
+
+    # Update engagement if we got non-zero values
+    if data.get("reactions") and data["reactions"] > (post.reactions or 0):
+        post.reactions = data["reactions"]
+        updated = True
+    if data.get("comments") and data["comments"] > (post.comments or 0):
+        post.comments = data["comments"]
+        updated = True
+    replace_engagement(object_session(post), old_engagement, raw_engagement(post.reactions, post.comments))
+
+    # Update author info if missing
+    if data.get("author_name") and not post.author_name:
+        post.author_name = data["author_name"]
+        updated = True
+    if data.get("author_jobtitle") and not post.author_jobtitle:
+        post.author_jobtitle = data["author_jobtitle"]
+        updated = True
+
+    return updated
+
+
+def _reextract(posts: list[Post], db: Session) -> int:
+    """Apply fields extracted from each post's cached page and re-analyze the
+    posts that changed. Returns posts changed; the caller commits."""
+    from services.analysis_service import analyze_posts
+
+    changed = []
     for post in posts:
-        content_len = len(post.content or "")
-        needs_enrichment = content_len < 400 or (post.reactions == 0 and post.comments == 0)
-        if not needs_enrichment:
-            continue
-
-        data = fetch_post_content(post.post_url)
-        if not data:
-            time.sleep(1.5)
-            continue
-
-        updated = False
-
-        # Update content if fetched version is longer
-        if data.get("content") and len(data["content"]) > content_len:
-            post.content = data["content"]
-            updated = True
-
-        # Update engagement if we got non-zero values
-        if data.get("reactions") and data["reactions"] > (post.reactions or 0):
-            post.reactions = data["reactions"]
-            updated = True
-        if data.get("comments") and data["comments"] > (post.comments or 0):
-            post.comments = data["comments"]
-            updated = True
-
-        # Update author info if missing
-        if data.get("author_name") and not post.author_name:
-            post.author_name = data["author_name"]
-            updated = True
-        if data.get("author_jobtitle") and not post.author_jobtitle:
-            post.author_jobtitle = data["author_jobtitle"]
-            updated = True
-
-        if updated:
-            enriched += 1
-
-        time.sleep(1.5)
+        data = fetch_post_content(post.post_url, offline=True) if post.post_url else None
+        if data and apply_fetched(post, data, replace_content=True):
+            changed.append(post)
+    if changed:
+        analyze_posts(changed, db)
+    return len(changed)
 
-    if enriched:
-        db.commit()
-        logger.info(f"Enriched {enriched} posts for job {job_id}")
 
-    return enriched
+_REEXTRACT = "reextract_cached_content"
 
 
-def enrich_posts_needing_content(db: Session) -> int:
-    """Find and enrich all posts with truncated content or 0 engagement."""
-    from sqlalchemy import func, and_, or_
-
-    posts = (
-        db.query(Post)
-        .filter(
-            or_(
-                func.length(Post.content) < 400,
-                and_(Post.reactions == 0, Post.comments == 0),
-            )
-        )
-        .limit(50)  # Process in batches to avoid long-running requests
-        .all()
-    )
+def get_reextract_progress() -> dict:
+    """Progress of the re-extraction pass, whichever web worker runs it."""
+    from database import SessionLocal
 
-    enriched = 0
-    for post in posts:
-        data = fetch_post_content(post.post_url)
-        if not data:
-            time.sleep(1.5)
-            continue
-
-        content_len = len(post.content or "")
-        updated = False
-
-        if data.get("content") and len(data["content"]) > content_len:
-            post.content = data["content"]
-            updated = True
-        if data.get("reactions") and data["reactions"] > (post.reactions or 0):
-            post.reactions = data["reactions"]
-            updated = True
-        if data.get("comments") and data["comments"] > (post.comments or 0):
-            post.comments = data["comments"]
-            updated = True
-        if data.get("author_name") and not post.author_name:
-            post.author_name = data["author_name"]
-            updated = True
-        if data.get("author_jobtitle") and not post.author_jobtitle:
-            post.author_jobtitle = data["author_jobtitle"]
-            updated = True
-
-        if updated:
-            enriched += 1
-
-        time.sleep(1.5)
+    db = SessionLocal()
+    try:
+        progress = run_progress(db, _REEXTRACT)
+    finally:
+        db.close()
+    progress["enriched"] = progress.pop("succeeded")
+    return progress
 
-    if enriched:
+
+def start_reextract() -> dict:
+    """Run reextract_cached_content in a background thread unless a web
+    worker is already running it. Returns the pass's progress.
+    """
+    _start_reextract()
+    return get_reextract_progress()
+
+
+def _start_reextract() -> bool:
+    """Take the pass lease and start the pass. False if another process holds it."""
+    from database import SessionLocal
+
+    owner = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        if not acquire_lease(db, _REEXTRACT, owner, ANALYSIS_LEASE_MINUTES):
+            return False
+    finally:
+        db.close()
+
+    def _run():
+        db = SessionLocal()
+        try:
+            reextract_cached_content(db, owner)
+            status, error = "completed", None
+        except Exception as e:
+            logger.exception("Re-extraction pass failed")
+            db.rollback()
+            status, error = "failed", str(e)
+        try:
+            release_lease(db, _REEXTRACT, owner, status, error)
+        finally:
+            db.close()
+
+    threading.Thread(target=_run, daemon=True).start()
+    return True
+
+
+def reextract_cached_content(db: Session, owner: str) -> int:
+    """Re-run extraction over cached HTML for every post, without network access.
+
+    Use after changing the extraction rules: extracted content replaces the
+    stored content and changed posts are re-analyzed. Posts whose page was
+    never cached are left untouched. `owner` must hold the pass lease (see
+    start_reextract); the pass stops if it loses it. Commits every
+    ENRICH_COMMIT_CHUNK posts and resumes after the last committed post if
+    interrupted.
+    """
+    checkpoint = get_checkpoint(db, _REEXTRACT)
+    after = checkpoint.last_key if checkpoint else None
+    enriched = checkpoint.processed if checkpoint else 0
+    processed = 0
+    remaining = db.query(Post) if after is None else db.query(Post).filter(Post.id > after)
+    renew_lease(db, _REEXTRACT, owner, ANALYSIS_LEASE_MINUTES, total=remaining.count(), succeeded=enriched)
+    db.commit()
+
+    for posts in iter_keyset(db.query(Post), Post.id, ENRICH_COMMIT_CHUNK, after=after):
+        enriched += _reextract(posts, db)
+        processed += len(posts)
+        set_checkpoint(db, _REEXTRACT, posts[-1].id, enriched)
+        if not renew_lease(db, _REEXTRACT, owner, ANALYSIS_LEASE_MINUTES, processed=processed, succeeded=enriched):
+            db.rollback()
+            raise RuntimeError("Re-extraction lease expired and was taken over by another process")
         db.commit()
 
+    clear_checkpoint(db, _REEXTRACT)
+    db.commit()
+    refresh_engagement(db)
+    if enriched:
+        logger.info(f"Re-extracted {enriched} posts from cached HTML")
+
     return enriched
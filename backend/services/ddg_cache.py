@@ -0,0 +1,136 @@
+"""Persistent TTL cache for DuckDuckGo search responses."""
+
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable
+
+from config import DDG_CACHE_MAX_ENTRIES
+from database import SessionLocal
+from models import SearchCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Narrow time windows change quickly, so they expire sooner
+_TTL_BY_TIME_RANGE = {
+    "day": timedelta(hours=1),
+    "week": timedelta(hours=6),
+    "month": timedelta(hours=24),
+    "year": timedelta(hours=72),
+    "any": timedelta(hours=72),
+}
+
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+def _cache_key(search_query: str, timelimit: str | None, region: str | None, max_results: int) -> str:
+    normalized = " ".join(search_query.lower().split())
+    raw = json.dumps([normalized, timelimit, region, max_results])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _bump(stat: str, n: int = 1):
+    with _stats_lock:
+        _stats[stat] += n
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def cached_ddg_text(
+    search_query: str,
+    time_range: str,
+    timelimit: str | None,
+    region: str | None,
+    max_results: int,
+    fetch: Callable[[], list[dict]],
+) -> list[dict]:
+    """Return cached DDG results for this request, or call `fetch` and cache them.
+
+    Cache errors are logged and never fail the search itself.
+    """
+    if DDG_CACHE_MAX_ENTRIES <= 0:
+        return fetch()
+
+    key = _cache_key(search_query, timelimit, region, max_results)
+    cached = _lookup(key)
+    if cached is not None:
+        _bump("hits")
+        return cached
+
+    _bump("misses")
+    results = fetch()
+    ttl = _TTL_BY_TIME_RANGE.get(time_range, _TTL_BY_TIME_RANGE["any"])
+    _store(key, search_query, results, ttl)
+    return results
+
+
+def _lookup(key: str) -> list[dict] | None:
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        entry = db.query(SearchCacheEntry).filter(SearchCacheEntry.cache_key == key).first()
+        if not entry or not entry.expires_at or entry.expires_at <= now:
+            return None
+        entry.last_accessed = now
+        entry.hits = (entry.hits or 0) + 1
+        db.commit()
+        return json.loads(entry.results)
+    except Exception:
+        logger.exception("DDG cache lookup failed")
+        return None
+    finally:
+        db.close()
+
+
+def _store(key: str, search_query: str, results: list[dict], ttl: timedelta):
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        entry = db.query(SearchCacheEntry).filter(SearchCacheEntry.cache_key == key).first()
+        if entry is None:
+            entry = SearchCacheEntry(cache_key=key, search_query=search_query, hits=0)
+            db.add(entry)
+        entry.results = json.dumps(results, default=str)
+        entry.created_at = now
+        entry.expires_at = now + ttl
+        entry.last_accessed = now
+        db.commit()
+        _evict(db)
+    except Exception:
+        logger.exception("DDG cache store failed")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _evict(db):
+    """Drop expired entries, then least-recently-used ones beyond the size cap."""
+    now = datetime.utcnow()
+    expired = (
+        db.query(SearchCacheEntry)
+        .filter(SearchCacheEntry.expires_at <= now)
+        .delete(synchronize_session=False)
+    )
+    excess = db.query(SearchCacheEntry).count() - DDG_CACHE_MAX_ENTRIES
+    lru = 0
+    if excess > 0:
+        oldest = (
+            db.query(SearchCacheEntry.id)
+            .order_by(SearchCacheEntry.last_accessed)
+            .limit(excess)
+            .subquery()
+        )
+        lru = (
+            db.query(SearchCacheEntry)
+            .filter(SearchCacheEntry.id.in_(oldest))
+            .delete(synchronize_session=False)
+        )
+    if expired or lru:
+        db.commit()
+        _bump("evictions", expired + lru)
@@ -0,0 +1,243 @@
+"""
+Corpus-wide engagement statistics for score normalization.
+
+Raw engagement (reactions + 2 * comments) of every post is tracked in a
+running max and a log-bucketed histogram (about 4% relative resolution).
+Both live in the database (engagement_buckets, engagement_reference) and
+are updated in the same transaction as the posts that change them, so all
+web worker processes see the same numbers. Engagement scores are
+normalized against one reference value, a high percentile of that
+histogram, so scores from any job or pass are comparable and a single
+viral post does not compress everything else.
+
+Every stored score uses the same reference. Scoring new posts is a lookup
+against it; when the percentile drifts by more than ENGAGEMENT_RESCORE_DRIFT
+the whole table is rescaled with one UPDATE statement, in the transaction
+that records the new reference.
+"""
+
+import logging
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from config import ENGAGEMENT_PERCENTILE, ENGAGEMENT_RESCORE_DRIFT
+from models import Post, EngagementBucket, EngagementReference
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_PER_DOUBLING = 16
+N_BUCKETS = 512  # bucket 0 holds zero engagement; the last covers up to ~2^32
+_REFERENCE_ID = 1
+
+
+def raw_engagement(reactions: int | None, comments: int | None) -> int:
+    return (reactions or 0) + (comments or 0) * 2
+
+
+def _raw_column():
+    return func.coalesce(Post.reactions, 0) + func.coalesce(Post.comments, 0) * 2
+
+
+def _buckets(raw) -> np.ndarray:
+    raw = np.asarray(raw, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        buckets = 1 + np.floor(np.log2(np.maximum(raw, 1)) * BUCKETS_PER_DOUBLING)
+    return np.where(raw > 0, np.minimum(buckets, N_BUCKETS - 1), 0).astype(np.int64)
+
+
+class EngagementStats:
+    """Snapshot of the histogram, max and scored reference."""
+
+    def __init__(self, counts: np.ndarray, max_raw: int, scored_reference: float | None):
+        self.counts = counts
+        self.max = max_raw
+        # Reference every stored engagement_score was computed with
+        self.scored_reference = scored_reference
+
+    @classmethod
+    def load(cls, db: Session) -> "EngagementStats":
+        _ensure_counted(db)
+        counts = np.zeros(N_BUCKETS, dtype=np.int64)
+        for bucket, count in db.query(EngagementBucket.bucket, EngagementBucket.count):
+            if 0 <= bucket < N_BUCKETS:
+                counts[bucket] = count
+        row = db.get(EngagementReference, _REFERENCE_ID)
+        return cls(counts, row.max_raw or 0, row.scored_reference or None)
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile of raw engagement (upper bucket edge, capped at the max)."""
+        total = self.counts.sum()
+        if not total:
+            return 0.0
+        cumulative = np.cumsum(self.counts)
+        bucket = int(np.searchsorted(cumulative, total * min(max(q, 0.0), 100.0) / 100.0))
+        if bucket == 0:
+            return 0.0
+        upper = 2 ** (bucket / BUCKETS_PER_DOUBLING)
+        return float(min(upper, self.max))
+
+    def current_reference(self) -> float:
+        return max(self.percentile(ENGAGEMENT_PERCENTILE), 1.0)
+
+    @property
+    def reference(self) -> float:
+        """Normalization reference of the stored scores."""
+        return self.scored_reference or self.current_reference()
+
+    def drifted(self) -> bool:
+        if self.scored_reference is None:
+            return True
+        current = self.current_reference()
+        return abs(current - self.scored_reference) > ENGAGEMENT_RESCORE_DRIFT * self.scored_reference
+
+    def scores(self, reactions: Iterable[int | None], comments: Iterable[int | None]) -> np.ndarray:
+        """Engagement scores (0-100) against the stored reference."""
+        raw = np.array(
+            [raw_engagement(r, c) for r, c in zip(reactions, comments)], dtype=np.float64
+        )
+        return np.minimum(np.round(raw / self.reference * 100, 1), 100.0)
+
+
+# ---------------------------------------------------------------------------
+# Updates (all leave committing to the caller)
+# ---------------------------------------------------------------------------
+def _lock(db: Session):
+    """Start the write transaction now.
+
+    SQLite only takes its write lock at the first write, so a reference read
+    before it could be rescaled by another process before the caller commits
+    scores computed from it.
+    """
+    db.execute(
+        update(EngagementReference)
+        .where(EngagementReference.id == _REFERENCE_ID)
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+def rebuild(db: Session):
+    """Recount the histogram and max from the posts table (one grouped query).
+    Pending changes in the session are flushed first and counted."""
+    raw = _raw_column()
+    rows = db.query(raw, func.count(Post.id)).group_by(raw).all()
+    counts = np.zeros(N_BUCKETS, dtype=np.int64)
+    max_raw = 0
+    if rows:
+        values = np.array([r[0] for r in rows], dtype=np.int64)
+        np.add.at(counts, _buckets(values), np.array([r[1] for r in rows], dtype=np.int64))
+        max_raw = int(values.max())
+
+    db.query(EngagementBucket).delete(synchronize_session=False)
+    nonzero = np.flatnonzero(counts)
+    if len(nonzero):
+        db.execute(
+            insert(EngagementBucket),
+            [{"bucket": int(b), "count": int(counts[b])} for b in nonzero],
+        )
+    db.execute(
+        sqlite_insert(EngagementReference)
+        .values(id=_REFERENCE_ID, max_raw=max_raw)
+        .on_conflict_do_update(index_elements=["id"], set_={"max_raw": max_raw})
+    )
+
+
+def _ensure_counted(db: Session) -> bool:
+    """Count the posts table on first use. Returns True if that just happened,
+    in which case the session's pending posts are already included."""
+    if db.get(EngagementReference, _REFERENCE_ID) is not None:
+        return False
+    rebuild(db)
+    return True
+
+
+def _add(db: Session, buckets: np.ndarray):
+    uniq, counts = np.unique(buckets, return_counts=True)
+    stmt = sqlite_insert(EngagementBucket).values(
+        [{"bucket": int(b), "count": int(c)} for b, c in zip(uniq, counts)]
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["bucket"],
+        set_={"count": EngagementBucket.count + stmt.excluded.count},
+    ))
+
+
+def _raise_max(db: Session, raw: int):
+    db.execute(
+        update(EngagementReference)
+        .where(EngagementReference.id == _REFERENCE_ID)
+        .values(max_raw=func.max(func.coalesce(EngagementReference.max_raw, 0), raw))
+    )
+
+
+def observe_posts(db: Session, post_dicts: Iterable[dict]):
+    """Add newly saved posts (scraper dicts). Call in the transaction that
+    inserts them, before committing."""
+    raw = np.fromiter(
+        (raw_engagement(p.get("reactions"), p.get("comments")) for p in post_dicts), dtype=np.int64
+    )
+    if not len(raw) or _ensure_counted(db):
+        return
+    _add(db, _buckets(raw))
+    _raise_max(db, int(raw.max()))
+
+
+def replace(db: Session, old_raw: int, new_raw: int):
+    """Move one post whose counts were refreshed to its new bucket."""
+    if old_raw == new_raw or _ensure_counted(db):
+        return
+    old_bucket, new_bucket = (int(b) for b in _buckets([old_raw, new_raw]))
+    if old_bucket != new_bucket:
+        db.execute(
+            update(EngagementBucket)
+            .where(EngagementBucket.bucket == old_bucket, EngagementBucket.count > 0)
+            .values(count=EngagementBucket.count - 1)
+        )
+        _add(db, np.array([new_bucket]))
+    _raise_max(db, new_raw)
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+def scores(db: Session, reactions: Iterable[int | None], comments: Iterable[int | None]) -> np.ndarray:
+    """Engagement scores (0-100) against the stored reference. Holds the
+    write lock until the caller commits, so a concurrent rescale cannot
+    change the reference under these scores."""
+    _ensure_counted(db)
+    _lock(db)
+    return EngagementStats.load(db).scores(reactions, comments)
+
+
+def refresh(db: Session) -> bool:
+    """Rescale stored scores if the reference drifted. Call after committing
+    the posts that changed the stats. Commits; returns True if rescaled."""
+    _ensure_counted(db)
+    _lock(db)
+    stats = EngagementStats.load(db)
+    if not stats.drifted():
+        db.commit()
+        return False
+
+    rebuild(db)
+    reference = EngagementStats.load(db).current_reference()
+    updated = (
+        db.query(Post)
+        .filter(Post.engagement_score.isnot(None))
+        .update(
+            {Post.engagement_score: func.min(func.round(_raw_column() * 100.0 / reference, 1), 100.0)},
+            synchronize_session=False,
+        )
+    )
+    db.execute(
+        update(EngagementReference)
+        .where(EngagementReference.id == _REFERENCE_ID)
+        .values(scored_reference=reference)
+    )
+    db.commit()
+    logger.info(f"Rescored {updated} posts against engagement reference {reference:.1f}")
+    return True
@@ -0,0 +1,305 @@
+"""
+Persistent queue of posts waiting for content enrichment.
+
+Scrapes, monitors and the enrich-content endpoint only enqueue posts; a
+background worker drains the queue. Each post has one queue row, so work
+is deduplicated and survives restarts. Failed fetches are retried with
+backoff until ENRICH_QUEUE_MAX_ATTEMPTS, after which the post is marked
+failed and no longer picked up. A post whose fetch finished is done for
+good, whether or not it was improved; only a forced enqueue fetches done
+or failed posts again.
+
+Every gunicorn worker runs its own queue worker. Rows are claimed with a
+guarded UPDATE so a row is processed by one of them, and a claim that is
+not finished within ENRICH_QUEUE_LEASE_MINUTES is made due again.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, and_, or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from config import (
+    ENRICH_CONCURRENCY, ENRICH_QUEUE_BATCH, ENRICH_QUEUE_LEASE_MINUTES,
+    ENRICH_QUEUE_MAX_ATTEMPTS, ENRICH_QUEUE_RETRY_MINUTES, HTML_CACHE_FAILURE_TTL_HOURS,
+)
+from database import SessionLocal
+from models import EnrichmentTask, Post
+from services import html_cache
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_POLL_SECONDS = 10
+_MAX_RETRY_DELAY = timedelta(days=1)
+
+
+def _needs_content():
+    """Posts with truncated content or no engagement numbers yet."""
+    return or_(
+        func.length(Post.content) < 400,
+        and_(Post.reactions == 0, Post.comments == 0),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Enqueueing
+# ---------------------------------------------------------------------------
+def enqueue_posts(db: Session, post_ids: list[int], force: bool = False) -> int:
+    """Queue posts for enrichment. Returns the number queued or re-queued.
+
+    Posts that already have a queue row are skipped: a done task is final,
+    even when the fetch could not improve the post, so the same unfixable
+    posts are not fetched again by every scrape. `force` re-queues done,
+    failed and pending rows with a fresh attempt count; rows currently
+    running are never touched.
+    """
+    queued = 0
+    for i in range(0, len(post_ids), 500):
+        now = datetime.utcnow()
+        rows = [{"post_id": pid, "next_attempt_at": now} for pid in post_ids[i:i + 500]]
+        stmt = sqlite_insert(EnrichmentTask).values(rows)
+        if force:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["post_id"],
+                set_={
+                    "status": PENDING,
+                    "attempts": 0,
+                    "last_error": None,
+                    "next_attempt_at": now,
+                    "updated_at": now,
+                },
+                where=EnrichmentTask.status != RUNNING,
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["post_id"])
+        queued += db.execute(stmt).rowcount
+    db.commit()
+    if queued:
+        worker.wake()
+    return queued
+
+
+def enqueue_job_posts(job_id: str, db: Session) -> int:
+    """Queue the posts of a scrape job that need their content fetched."""
+    ids = [pid for (pid,) in db.query(Post.id).filter(Post.scrape_job_id == job_id, _needs_content())]
+    queued = enqueue_posts(db, ids)
+    if queued:
+        logger.info(f"Queued {queued} posts from job {job_id} for enrichment")
+    return queued
+
+
+def enqueue_posts_needing_content(db: Session, force: bool = False) -> int:
+    """Queue every post with truncated content or 0 engagement."""
+    ids = [pid for (pid,) in db.query(Post.id).filter(_needs_content())]
+    return enqueue_posts(db, ids, force=force)
+
+
+def get_stats(db: Session) -> dict:
+    counts = dict(
+        db.query(EnrichmentTask.status, func.count(EnrichmentTask.id))
+        .group_by(EnrichmentTask.status)
+        .all()
+    )
+    return {status: counts.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED)}
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+def _retry_delay(task: EnrichmentTask, url: str) -> timedelta:
+    entry = html_cache.lookup(url)
+    if html_cache.is_known_failure(entry):
+        # Retrying before the cached failure expires would fail without a fetch
+        expires = datetime.utcfromtimestamp(entry["fetched_at"]) + timedelta(
+            hours=HTML_CACHE_FAILURE_TTL_HOURS
+        )
+        return max(expires - datetime.utcnow(), timedelta(0))
+    delay = timedelta(minutes=ENRICH_QUEUE_RETRY_MINUTES * 2 ** (task.attempts - 1))
+    return min(delay, _MAX_RETRY_DELAY)
+
+
+def _failure_reason(url: str) -> str:
+    entry = html_cache.lookup(url)
+    if entry and entry.get("status") and entry["status"] != 200:
+        return f"HTTP {entry['status']}"
+    return "no metadata extracted"
+
+
+def _record_failure(task: EnrichmentTask, url: str, error: str):
+    task.attempts += 1
+    task.last_error = error[:500]
+    if task.attempts >= ENRICH_QUEUE_MAX_ATTEMPTS:
+        task.status = FAILED
+    else:
+        task.status = PENDING
+        task.next_attempt_at = datetime.utcnow() + _retry_delay(task, url)
+
+
+class EnrichmentWorker:
+    """Background thread that claims due queue rows in batches and fetches them."""
+
+    def __init__(self, batch_size: int = ENRICH_QUEUE_BATCH):
+        self.batch_size = max(batch_size, 1)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._recover()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="enrichment-worker", daemon=True)
+        self._thread.start()
+        logger.info("Enrichment worker started")
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    def _recover(self):
+        """Make rows due again whose claim outlived the lease.
+
+        Their worker died or was restarted mid-batch. Rows claimed recently
+        may belong to another live process and are left alone.
+        """
+        db = SessionLocal()
+        try:
+            expired = datetime.utcnow() - timedelta(minutes=ENRICH_QUEUE_LEASE_MINUTES)
+            reset = (
+                db.query(EnrichmentTask)
+                .filter(EnrichmentTask.status == RUNNING, EnrichmentTask.updated_at < expired)
+                .update({"status": PENDING}, synchronize_session=False)
+            )
+            db.commit()
+            if reset:
+                logger.info(f"Re-queued {reset} interrupted enrichment tasks")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                processed = self.drain_once()
+            except Exception:
+                logger.exception("Enrichment worker pass failed")
+                processed = 0
+            if not processed:
+                self._wake.wait(_POLL_SECONDS)
+                self._wake.clear()
+                try:
+                    self._recover()
+                except Exception:
+                    logger.exception("Enrichment queue recovery failed")
+
+    def drain_once(self) -> int:
+        """Claim and process one batch of due tasks. Returns the number processed."""
+        db = SessionLocal()
+        try:
+            candidates = [
+                task_id for (task_id,) in (
+                    db.query(EnrichmentTask.id)
+                    .filter(
+                        EnrichmentTask.status == PENDING,
+                        EnrichmentTask.next_attempt_at <= datetime.utcnow(),
+                    )
+                    .order_by(EnrichmentTask.next_attempt_at)
+                    .limit(self.batch_size)
+                )
+            ]
+            if not candidates:
+                return 0
+
+            # Another process may have claimed some of these since the
+            # SELECT; the status guard skips them, and the claim time tells
+            # our rows apart afterwards
+            claimed_at = datetime.utcnow()
+            db.execute(
+                update(EnrichmentTask)
+                .where(EnrichmentTask.id.in_(candidates), EnrichmentTask.status == PENDING)
+                .values(status=RUNNING, updated_at=claimed_at)
+            )
+            db.commit()
+            tasks = (
+                db.query(EnrichmentTask)
+                .filter(
+                    EnrichmentTask.id.in_(candidates),
+                    EnrichmentTask.status == RUNNING,
+                    EnrichmentTask.updated_at == claimed_at,
+                )
+                .all()
+            )
+            if not tasks:
+                return 0
+
+            self._process(db, tasks)
+            return len(tasks)
+        finally:
+            db.close()
+
+    def _process(self, db: Session, tasks: list[EnrichmentTask]):
+        from services.content_fetcher import fetch_post_content, apply_fetched
+        from services.analysis_service import analyze_posts
+        from services.engagement_stats import refresh as refresh_engagement
+
+        posts = {
+            p.id: p
+            for p in db.query(Post).filter(Post.id.in_([t.post_id for t in tasks]))
+        }
+
+        with ThreadPoolExecutor(max_workers=max(1, ENRICH_CONCURRENCY)) as executor:
+            futures = {
+                task.id: executor.submit(fetch_post_content, posts[task.post_id].post_url)
+                for task in tasks
+                if task.post_id in posts and posts[task.post_id].post_url
+            }
+
+        changed = []
+        for task in tasks:
+            task.updated_at = datetime.utcnow()
+            future = futures.get(task.id)
+            if future is None:
+                # Post was deleted or has no URL
+                task.status = DONE
+                continue
+
+            post = posts[task.post_id]
+            try:
+                data = future.result()
+            except Exception as e:
+                _record_failure(task, post.post_url, repr(e))
+                continue
+
+            if data is None:
+                _record_failure(task, post.post_url, _failure_reason(post.post_url))
+                continue
+
+            task.status = DONE
+            task.last_error = None
+            if apply_fetched(post, data):
+                changed.append(post)
+
+        if changed:
+            # Content changed, so sentiment/topics from the snippet are stale
+            analyze_posts(changed, db)
+        db.commit()
+        if changed:
+            refresh_engagement(db)
+
+        failed = sum(1 for t in tasks if t.status != DONE)
+        logger.info(f"Enrichment pass: {len(tasks)} tasks, {len(changed)} posts updated, {failed} failed")
+
+
+worker = EnrichmentWorker()
@@ -0,0 +1,226 @@
+"""
+On-disk cache of fetched post-page HTML.
+
+Bodies are stored gzip-compressed under the SHA-256 of their content, so
+identical pages are kept once. A small JSON index entry per URL records the
+body hash plus ETag/Last-Modified for conditional revalidation, and whether
+the body is only the prefix of the page that extraction read. Failed
+fetches are remembered for a while so hopeless URLs aren't re-downloaded
+on every enrichment pass. Total body size is capped; least recently used
+URLs are evicted first.
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+
+from config import HTML_CACHE_DIR, HTML_CACHE_MAX_MB, HTML_CACHE_FAILURE_TTL_HOURS
+
+logger = logging.getLogger(__name__)
+
+_INDEX_DIR = os.path.join(HTML_CACHE_DIR, "index")
+_BODY_DIR = os.path.join(HTML_CACHE_DIR, "bodies")
+
+_lock = threading.Lock()
+_total_bytes: int | None = None  # lazily computed from disk
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _index_path(url: str) -> str:
+    return os.path.join(_INDEX_DIR, _url_key(url) + ".json")
+
+
+def _body_path(content_hash: str) -> str:
+    return os.path.join(_BODY_DIR, content_hash + ".html.gz")
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def lookup(url: str) -> dict | None:
+    """Return the index entry for a URL, or None. Marks the entry as recently used."""
+    path = _index_path(url)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)
+        return entry
+    except (OSError, ValueError):
+        return None
+
+
+def is_known_failure(entry: dict | None) -> bool:
+    """True if the URL failed recently enough that it shouldn't be refetched yet."""
+    if not entry or entry.get("content_hash"):
+        return False
+    ttl = HTML_CACHE_FAILURE_TTL_HOURS * 3600
+    return time.time() - entry.get("fetched_at", 0) < ttl
+
+
+def conditional_headers(entry: dict | None) -> dict:
+    """If-None-Match / If-Modified-Since headers for revalidating a cached body."""
+    headers = {}
+    if entry and entry.get("content_hash"):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def read_body(entry: dict | None) -> str | None:
+    if not entry or not entry.get("content_hash"):
+        return None
+    try:
+        with gzip.open(_body_path(entry["content_hash"]), "rb") as f:
+            return f.read().decode("utf-8")
+    except OSError:
+        return None
+
+
+def store(url: str, html: str, etag: str | None = None, last_modified: str | None = None,
+          partial: bool = False):
+    """Cache a successful fetch. `partial` marks a body that holds only the
+    start of the page, up to where streaming extraction stopped reading."""
+    global _total_bytes
+    raw = html.encode("utf-8")
+    content_hash = hashlib.sha256(raw).hexdigest()
+    body_path = _body_path(content_hash)
+
+    with _lock:
+        os.makedirs(_INDEX_DIR, exist_ok=True)
+        os.makedirs(_BODY_DIR, exist_ok=True)
+        if not os.path.isfile(body_path):
+            compressed = gzip.compress(raw)
+            _write_atomic(body_path, compressed)
+            if _total_bytes is not None:
+                _total_bytes += len(compressed)
+        _write_index(url, {
+            "url": url,
+            "content_hash": content_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "partial": partial,
+            "status": 200,
+            "fetched_at": time.time(),
+        })
+        if _current_size() > HTML_CACHE_MAX_MB * 1024 * 1024:
+            _evict()
+
+
+def store_failure(url: str, status: int | None):
+    """Remember a failed fetch so it is skipped until the failure TTL passes."""
+    with _lock:
+        os.makedirs(_INDEX_DIR, exist_ok=True)
+        _write_index(url, {
+            "url": url,
+            "content_hash": None,
+            "status": status,
+            "fetched_at": time.time(),
+        })
+
+
+def touch(url: str, entry: dict):
+    """Record a successful revalidation (304)."""
+    with _lock:
+        _write_index(url, {**entry, "fetched_at": time.time()})
+
+
+def _write_index(url: str, entry: dict):
+    _write_atomic(_index_path(url), json.dumps(entry).encode("utf-8"))
+
+
+def _current_size() -> int:
+    global _total_bytes
+    if _total_bytes is None:
+        _total_bytes = sum(
+            e.stat().st_size for e in os.scandir(_BODY_DIR) if e.name.endswith(".gz")
+        )
+    return _total_bytes
+
+
+def _evict():
+    """Drop orphaned bodies, then least recently used URLs until bodies fit
+    in 90% of the cap.
+
+    A body is orphaned when every URL that pointed at it was re-stored with
+    a different hash or replaced by a failure entry. The size total is
+    recounted from disk here, since other processes write to the cache too.
+    """
+    global _total_bytes
+    target = HTML_CACHE_MAX_MB * 1024 * 1024 * 0.9
+
+    entries = []
+    for e in os.scandir(_INDEX_DIR):
+        if not e.name.endswith(".json"):
+            continue
+        try:
+            with open(e.path, "r", encoding="utf-8") as f:
+                content_hash = json.load(f).get("content_hash")
+            entries.append((e.stat().st_mtime, e.path, content_hash))
+        except (OSError, ValueError):
+            continue
+    entries.sort()
+
+    refs: dict[str, int] = {}
+    for _, _, content_hash in entries:
+        if content_hash:
+            refs[content_hash] = refs.get(content_hash, 0) + 1
+
+    sizes: dict[str, int] = {}
+    orphans = 0
+    # Bodies are written before their index entry; leave fresh ones alone
+    fresh_cutoff = time.time() - 60
+    for e in os.scandir(_BODY_DIR):
+        if not e.name.endswith(".html.gz"):
+            continue
+        content_hash = e.name[: -len(".html.gz")]
+        try:
+            st = e.stat()
+            if content_hash in refs or st.st_mtime > fresh_cutoff:
+                sizes[content_hash] = st.st_size
+            else:
+                os.remove(e.path)
+                orphans += 1
+        except OSError:
+            continue
+    _total_bytes = sum(sizes.values())
+
+    removed = 0
+    for _, index_path, content_hash in entries:
+        if _total_bytes <= target:
+            break
+        try:
+            os.remove(index_path)
+        except OSError:
+            continue
+        removed += 1
+        if not content_hash:
+            continue
+        refs[content_hash] -= 1
+        if refs[content_hash] == 0:
+            try:
+                os.remove(_body_path(content_hash))
+                _total_bytes -= sizes.pop(content_hash, 0)
+            except OSError:
+                pass
+    logger.info(f"HTML cache removed {orphans} orphaned bodies and evicted {removed} entries")
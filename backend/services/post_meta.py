@@ -0,0 +1,250 @@
+"""
+Streaming extraction of post metadata from LinkedIn public post pages.
+
+Enrichment only needs og:description, og:title, <meta name="author"> and
+the JSON-LD blocks, so instead of building a full BeautifulSoup tree the
+page is fed chunk by chunk through a stdlib HTMLParser that records just
+those elements. Reading stops once </head> has been seen and a JSON-LD
+block describing the post itself has been closed (a breadcrumb or
+organization block in the head is not enough); the rest of the page is
+never read. The prefix that was read is what gets cached, flagged as
+partial, and re-extracts to the same fields.
+"""
+
+import json
+from collections.abc import Iterator
+from html.parser import HTMLParser
+
+# JSON-LD @types that describe the post; pages also carry breadcrumb and
+# organization blocks that must not end parsing
+_POST_TYPES = {
+    "DiscussionForumPosting", "SocialMediaPosting", "Article", "NewsArticle",
+    "BlogPosting", "Comment",
+}
+
+
+class _PostMetaParser(HTMLParser):
+    """Collects the first matching meta tags and every JSON-LD script body."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Like soup.find(): only the first matching element counts, even if
+        # its content attribute is missing
+        self.og_description: tuple[str | None] | None = None
+        self.og_title: tuple[str | None] | None = None
+        self.author: tuple[str | None] | None = None
+        self.jsonld: list[str | None] = []
+        self.head_closed = False
+        self.post_seen = False
+        self._script_parts: list[str] | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.head_closed and self.post_seen
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            prop = attrs.get("property")
+            if prop == "og:description" and self.og_description is None:
+                self.og_description = (attrs.get("content"),)
+            elif prop == "og:title" and self.og_title is None:
+                self.og_title = (attrs.get("content"),)
+            if attrs.get("name") == "author" and self.author is None:
+                self.author = (attrs.get("content"),)
+        elif tag == "script" and dict(attrs).get("type") == "application/ld+json":
+            self._script_parts = []
+
+    def handle_data(self, data):
+        if self._script_parts is not None:
+            self._script_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script_parts is not None:
+            # An empty script has no .string in BeautifulSoup either
+            text = "".join(self._script_parts) or None
+            self.jsonld.append(text)
+            self._script_parts = None
+            if not self.post_seen and text:
+                self.post_seen = _describes_post(text)
+        elif tag == "head":
+            self.head_closed = True
+
+    def result(self) -> dict | None:
+        result: dict = {}
+
+        # og:description — typically longer than DDG snippet
+        if self.og_description and self.og_description[0]:
+            result["content"] = self.og_description[0].strip()
+
+        # og:title — may include author name
+        if self.og_title and self.og_title[0]:
+            title_text = self.og_title[0].strip()
+            if " on LinkedIn:" in title_text:
+                parts = title_text.split(" on LinkedIn:", 1)
+                result["author_name"] = parts[0].strip()
+
+        if self.author and self.author[0]:
+            result["author_name"] = self.author[0].strip()
+
+        for text in self.jsonld:
+            try:
+                data = json.loads(text)
+                if isinstance(data, dict):
+                    _extract_jsonld(data, result)
+                elif isinstance(data, list):
+                    for item in data:
+                        if isinstance(item, dict):
+                            _extract_jsonld(item, result)
+            except (json.JSONDecodeError, TypeError):
+                continue
+
+        return result if result else None
+
+
+def _describes_post(text: str) -> bool:
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return False
+    items = data if isinstance(data, list) else [data]
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        types = item.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if any(t in _POST_TYPES for t in types):
+            return True
+        if "articleBody" in item or "interactionStatistic" in item:
+            return True
+    return False
+
+
+def _extract_jsonld(data: dict, result: dict):
+    """Extract useful fields from a JSON-LD object."""
+    # Author info
+    author = data.get("author")
+    if isinstance(author, dict):
+        if author.get("name"):
+            result["author_name"] = author["name"]
+        if author.get("jobTitle"):
+            result["author_jobtitle"] = author["jobTitle"]
+
+    # Interaction statistics
+    stats = data.get("interactionStatistic")
+    if isinstance(stats, list):
+        for stat in stats:
+            if not isinstance(stat, dict):
+                continue
+            itype = stat.get("interactionType", "")
+            count = stat.get("userInteractionCount", 0)
+            try:
+                count = int(count)
+            except (ValueError, TypeError):
+                continue
+            if "Like" in itype or "React" in itype:
+                result["reactions"] = count
+            elif "Comment" in itype:
+                result["comments"] = count
+
+    # Article body text
+    if data.get("articleBody"):
+        body = data["articleBody"].strip()
+        if len(body) > len(result.get("content", "")):
+            result["content"] = body
+
+
+def extract_streaming(chunks: Iterator[str]) -> tuple[dict | None, str, bool]:
+    """Parse text chunks until the metadata is complete.
+
+    Returns (fields, html, complete): html is the part of the page that was
+    read, and complete is False if reading stopped before the end.
+    """
+    parser = _PostMetaParser()
+    read = []
+    for chunk in chunks:
+        read.append(chunk)
+        parser.feed(chunk)
+        if parser.done:
+            return parser.result(), "".join(read), False
+    parser.close()
+    return parser.result(), "".join(read), True
+
+
+def extract_post_fields(html: str) -> dict | None:
+    """Extract post metadata from a page, or from the prefix extract_streaming read."""
+    parser = _PostMetaParser()
+    parser.feed(html)
+    parser.close()
+    return parser.result()
+
+
+def _extract_with_soup(html: str, parser: str | None = None) -> dict | None:
+    """Previous full-tree BeautifulSoup extraction, kept for the comparison below."""
+    from parsing import make_soup
+
+    soup = make_soup(html, parser)
+    result: dict = {}
+
+    og_desc = soup.find("meta", property="og:description")
+    if og_desc and og_desc.get("content"):
+        result["content"] = og_desc["content"].strip()
+
+    og_title = soup.find("meta", property="og:title")
+    if og_title and og_title.get("content"):
+        title_text = og_title["content"].strip()
+        if " on LinkedIn:" in title_text:
+            result["author_name"] = title_text.split(" on LinkedIn:", 1)[0].strip()
+
+    meta_author = soup.find("meta", attrs={"name": "author"})
+    if meta_author and meta_author.get("content"):
+        result["author_name"] = meta_author["content"].strip()
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string)
+            if isinstance(data, dict):
+                _extract_jsonld(data, result)
+            elif isinstance(data, list):
+                for item in data:
+                    if isinstance(item, dict):
+                        _extract_jsonld(item, result)
+        except (json.JSONDecodeError, TypeError):
+            continue
+
+    return result if result else None
+
+
+if __name__ == "__main__":
+    # Compare against the soup extractor: python -m services.post_meta page1.html page2.html ...
+    import sys
+    import time
+
+    chunk_size = 1024
+    mismatches = 0
+    soup_s = stream_s = 0.0
+    page_chars = read_chars = 0
+    for path in sys.argv[1:]:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+
+        started = time.perf_counter()
+        expected = _extract_with_soup(html)
+        soup_s += time.perf_counter() - started
+
+        started = time.perf_counter()
+        chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+        got, cached, complete = extract_streaming(chunks)
+        stream_s += time.perf_counter() - started
+        page_chars += len(html)
+        read_chars += len(cached)
+
+        # The cached prefix must re-extract the same way
+        offline = extract_post_fields(cached)
+        if got != expected or offline != expected or (complete and cached != html):
+            mismatches += 1
+            print(f"MISMATCH {path}\n  soup:    {expected}\n  stream:  {got}\n  offline: {offline}")
+
+    pages = len(sys.argv) - 1
+    print(f"{pages} pages  soup: {soup_s:.3f}s  streaming: {stream_s:.3f}s  "
+          f"read: {read_chars}/{page_chars} chars  mismatches: {mismatches}")
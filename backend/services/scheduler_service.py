@@ -7,7 +7,10 @@ from datetime import datetime, timedelta
 
 from database import SessionLocal
 from models import SavedSearch, MonitorResult, Post
-from scraper import search_linkedin_posts, search_linkedin_native, HAS_SELENIUM
+from scraper import (
+    search_linkedin_posts, search_linkedin_posts_many, search_linkedin_native, search_key, HAS_SELENIUM,
+)
+from services.engagement_stats import observe_posts
 
 logger = logging.getLogger(__name__)
 
@@ -53,14 +56,17 @@ def _tick():
         try:
             searches = db.query(SavedSearch).filter(SavedSearch.enabled == True).all()
             now = datetime.utcnow()
-
-            for search in searches:
-                interval = timedelta(hours=search.schedule_hours)
-                if search.last_run is None or (now - search.last_run) >= interval:
-                    try:
-                        _execute_saved_search(search, db)
-                    except Exception:
-                        logger.exception(f"Error running saved search {search.id}")
+            due = [
+                s for s in searches
+                if s.last_run is None or (now - s.last_run) >= timedelta(hours=s.schedule_hours)
+            ]
+
+            prefetched = _prefetch_ddg(due)
+            for search in due:
+                try:
+                    _execute_saved_search(search, db, prefetched.get(search_key(_ddg_spec(search))))
+                except Exception:
+                    logger.exception(f"Error running saved search {search.id}")
         finally:
             db.close()
     except Exception:
@@ -69,8 +75,44 @@ def _tick():
     _schedule_next()
 
 
-def _execute_saved_search(search: SavedSearch, db):
-    """Run a single saved search and record results."""
+def _ddg_spec(search: SavedSearch) -> dict:
+    return {
+        "query": search.query,
+        "max_posts": search.max_posts,
+        "content_type": search.content_type,
+        "time_range": search.time_range,
+        "location": search.location,
+    }
+
+
+def _prefetch_ddg(searches: list[SavedSearch]) -> dict[tuple, list[dict]]:
+    """Run the DDG searches of all due saved searches concurrently.
+
+    Only used when native search is unavailable; otherwise each saved search
+    tries native first and falls back to DDG on its own. Every search gets
+    its complete result list, even where it overlaps another search's.
+    Searches whose query failed have no entry, so they search again on
+    their own (and raise if that fails too).
+    """
+    from config import has_auth
+
+    if len(searches) < 2 or (HAS_SELENIUM and has_auth()):
+        return {}
+
+    results: dict[tuple, list[dict]] = {}
+    search_linkedin_posts_many(
+        [_ddg_spec(s) for s in searches],
+        on_results=lambda spec, posts: results.setdefault(search_key(spec), []).extend(dict(p) for p in posts),
+    )
+    return results
+
+
+def _execute_saved_search(search: SavedSearch, db, ddg_posts: list[dict] | None = None):
+    """Run a single saved search and record results.
+
+    `ddg_posts` are DDG results already fetched for this search (see
+    _prefetch_ddg), used instead of searching again.
+    """
     import os
     from config import COOKIE_FILE, load_credentials, has_auth
 
@@ -100,7 +142,9 @@ def _execute_saved_search(search: SavedSearch, db):
             post_dicts = None
 
     # Fall back to DDG search
-    if post_dicts is None:
+    if post_dicts is None and ddg_posts is not None:
+        post_dicts = ddg_posts
+    elif post_dicts is None:
         post_dicts = search_linkedin_posts(
             query=search.query,
             max_posts=search.max_posts,
@@ -110,21 +154,23 @@ def _execute_saved_search(search: SavedSearch, db):
         )
 
     # Save new posts (update job_id on duplicates)
-    added = 0
+    new_posts = []
     for p in post_dicts:
         existing = db.query(Post).filter(Post.post_id == p["post_id"]).first()
         if not existing:
             p["scrape_job_id"] = job_id
             db.add(Post(**p))
-            added += 1
+            new_posts.append(p)
         else:
             existing.scrape_job_id = job_id
+    observe_posts(db, new_posts)
     db.commit()
+    added = len(new_posts)
 
-    # Run content enrichment on new posts
+    # Queue content enrichment for new posts
     try:
-        from services.content_fetcher import enrich_posts_with_content
-        enrich_posts_with_content(job_id, db)
+        from services.enrichment_queue import enqueue_job_posts
+        enqueue_job_posts(job_id, db)
     except Exception:
         pass
 
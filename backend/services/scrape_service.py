@@ -1,8 +1,12 @@
 import uuid
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
 from models import Post
-from scraper import scrape_linkedin_posts, search_linkedin_posts, search_linkedin_native, HAS_SELENIUM
+from scraper import iter_profile_posts, iter_linkedin_posts, iter_linkedin_native, HAS_SELENIUM
 from database import SessionLocal
+from config import BROWSER_POOL_SIZE
+from services.engagement_stats import observe_posts
 
 # In-memory job tracking
 jobs: dict[str, dict] = {}
@@ -60,42 +64,94 @@ def start_search_job(
     return job_id
 
 
-def _save_posts(job_id: str, post_dicts: list[dict]):
+def start_batch_scrape_job(
+    profile_urls: list[str],
+    max_posts: int,
+    cookie_path: str | None = None,
+    email: str | None = None,
+    password: str | None = None,
+) -> str:
+    job_id = str(uuid.uuid4())
+    unique_urls = list(dict.fromkeys(u.strip() for u in profile_urls if u and u.strip()))
+    jobs[job_id] = {
+        "status": "running",
+        "posts_found": 0,
+        "error": None,
+        "profile_url": None,
+        "query": None,
+        "profiles_total": len(unique_urls),
+        "profiles_done": 0,
+        "profiles_failed": 0,
+        "profiles": [
+            {"profile_url": url, "status": "pending", "posts_found": 0, "error": None}
+            for url in unique_urls
+        ],
+    }
+    thread = threading.Thread(
+        target=_run_batch_scrape,
+        args=(job_id, max_posts, cookie_path, email, password),
+        daemon=True,
+    )
+    thread.start()
+    return job_id
+
+
+def _save_batch(db, job_id: str, post_dicts: list[dict]) -> int:
+    """Insert new posts and re-associate existing ones with this job. Returns posts added."""
+    new_posts = []
+    for p in post_dicts:
+        existing = db.query(Post).filter(Post.post_id == p["post_id"]).first()
+        if not existing:
+            p["scrape_job_id"] = job_id
+            db.add(Post(**p))
+            new_posts.append(p)
+        else:
+            # Re-associate existing post with this job so job_id filter works
+            existing.scrape_job_id = job_id
+    observe_posts(db, new_posts)
+    db.commit()
+    return len(new_posts)
+
+
+def _save_post_stream(job_id: str, batches: Iterable[list[dict]]):
+    """Write each batch as soon as the scraper yields it, then run enrichment.
+
+    Posts become visible through the job_id filter while collection is still
+    running, and only one batch is held in memory at a time.
+    """
     db = SessionLocal()
     try:
         added = 0
-        for p in post_dicts:
-            existing = db.query(Post).filter(Post.post_id == p["post_id"]).first()
-            if not existing:
-                p["scrape_job_id"] = job_id
-                db.add(Post(**p))
-                added += 1
-            else:
-                # Re-associate existing post with this job so job_id filter works
-                existing.scrape_job_id = job_id
-        db.commit()
-
-        # Mark completed immediately so the frontend can show results
-        # Use total DDG results if more were found than newly added (duplicates)
-        jobs[job_id]["posts_found"] = max(added, len(post_dicts))
-        jobs[job_id]["status"] = "completed"
-
-        # Run enrichment in the background — don't block the user
-        try:
-            from services.content_fetcher import enrich_posts_with_content
-            enrich_posts_with_content(job_id, db)
-        except Exception:
-            pass
+        seen = 0
+        for batch in batches:
+            added += _save_batch(db, job_id, batch)
+            seen += len(batch)
 
-        try:
-            from services.analysis_service import enrich_posts
-            enrich_posts(job_id, db)
-        except Exception:
-            pass
+        # Use total results if more were found than newly added (duplicates)
+        jobs[job_id]["posts_found"] = max(added, seen)
+        _finish_job(job_id, db)
     finally:
         db.close()
 
 
+def _finish_job(job_id: str, db):
+    # Mark completed immediately so the frontend can show results
+    jobs[job_id]["status"] = "completed"
+
+    # Content fetching happens on the enrichment queue worker
+    try:
+        from services.enrichment_queue import enqueue_job_posts
+        enqueue_job_posts(job_id, db)
+    except Exception:
+        pass
+
+    try:
+        from services.analysis_service import enrich_posts
+        enrich_posts(job_id, db)
+    except Exception:
+        pass
+
+
 def _run_scrape(
     job_id: str,
     profile_url: str,
@@ -108,7 +164,7 @@ def _run_scrape(
         def on_progress(count):
             jobs[job_id]["posts_found"] = count
 
-        post_dicts = scrape_linkedin_posts(
+        batches = iter_profile_posts(
             profile_url=profile_url,
             max_posts=max_posts,
             cookie_path=cookie_path,
@@ -116,12 +172,75 @@ def _run_scrape(
             password=password,
             on_post_found=on_progress,
         )
-        _save_posts(job_id, post_dicts)
+        _save_post_stream(job_id, batches)
     except Exception as e:
         jobs[job_id]["status"] = "failed"
         jobs[job_id]["error"] = str(e)
 
 
+def _run_batch_scrape(
+    job_id: str,
+    max_posts: int,
+    cookie_path: str | None,
+    email: str | None,
+    password: str | None,
+):
+    """Scrape every profile in the job on a fixed set of browser workers.
+
+    A failing profile is recorded and skipped; posts it already yielded stay saved.
+    """
+    job = jobs[job_id]
+    lock = threading.Lock()
+
+    def scrape_one(profile: dict):
+        profile["status"] = "running"
+        db = SessionLocal()
+        try:
+            def on_progress(count):
+                with lock:
+                    job["posts_found"] += count - profile["posts_found"]
+                    profile["posts_found"] = count
+
+            for batch in iter_profile_posts(
+                profile_url=profile["profile_url"],
+                max_posts=max_posts,
+                cookie_path=cookie_path,
+                email=email,
+                password=password,
+                on_post_found=on_progress,
+            ):
+                _save_batch(db, job_id, batch)
+            profile["status"] = "completed"
+        except Exception as e:
+            db.rollback()
+            profile["status"] = "failed"
+            profile["error"] = str(e)
+            with lock:
+                job["profiles_failed"] += 1
+        finally:
+            db.close()
+            with lock:
+                job["profiles_done"] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(BROWSER_POOL_SIZE, 1)) as executor:
+            list(executor.map(scrape_one, job["profiles"]))
+
+        if job["profiles_total"] and job["profiles_failed"] == job["profiles_total"]:
+            job["status"] = "failed"
+            job["error"] = "All profiles failed."
+            return
+
+        db = SessionLocal()
+        try:
+            _finish_job(job_id, db)
+        finally:
+            db.close()
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+
 def _run_search(
     job_id: str, query: str, max_posts: int,
     content_type: str = "posts", time_range: str = "any", location: str = "any",
@@ -131,40 +250,55 @@ def _run_search(
         def on_progress(count):
             jobs[job_id]["posts_found"] = count
 
-        post_dicts = None
-
-        # Try native LinkedIn search first when Selenium + auth are available
-        if HAS_SELENIUM and (cookie_path or (email and password)):
-            try:
-                post_dicts = search_linkedin_native(
-                    query=query,
-                    max_posts=max_posts,
-                    content_type=content_type,
-                    time_range=time_range,
-                    location=location,
-                    cookie_path=cookie_path,
-                    email=email,
-                    password=password,
-                    on_post_found=on_progress,
-                )
-            except Exception:
-                post_dicts = None
-
-        # Fall back to DDG search
-        if post_dicts is None:
-            post_dicts = search_linkedin_posts(
+        _save_post_stream(job_id, _search_batches(
+            query, max_posts, content_type, time_range, location,
+            cookie_path, email, password, on_progress,
+        ))
+    except Exception as e:
+        jobs[job_id]["status"] = "failed"
+        jobs[job_id]["error"] = str(e)
+
+
+def _search_batches(
+    query: str, max_posts: int, content_type: str, time_range: str, location: str,
+    cookie_path: str | None, email: str | None, password: str | None,
+    on_progress: Callable[[int], None],
+) -> Iterator[list[dict]]:
+    """Yield native LinkedIn search batches, falling back to DDG if native fails."""
+    found = 0
+
+    # Try native LinkedIn search first when Selenium + auth are available
+    if HAS_SELENIUM and (cookie_path or (email and password)):
+        try:
+            for batch in iter_linkedin_native(
                 query=query,
                 max_posts=max_posts,
                 content_type=content_type,
                 time_range=time_range,
                 location=location,
+                cookie_path=cookie_path,
+                email=email,
+                password=password,
                 on_post_found=on_progress,
-            )
+            ):
+                found += len(batch)
+                yield batch
+            return
+        except Exception:
+            pass
 
-        _save_posts(job_id, post_dicts)
-    except Exception as e:
-        jobs[job_id]["status"] = "failed"
-        jobs[job_id]["error"] = str(e)
+    if found >= max_posts:
+        return
+
+    # Fall back to DDG search for whatever native search didn't deliver
+    yield from iter_linkedin_posts(
+        query=query,
+        max_posts=max_posts - found,
+        content_type=content_type,
+        time_range=time_range,
+        location=location,
+        on_post_found=lambda n: on_progress(found + n),
+    )
 
 
 def get_job(job_id: str) -> dict | None:
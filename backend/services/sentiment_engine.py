@@ -0,0 +1,324 @@
+"""
+Batch lexicon sentiment scorer, an alternative to per-post TextBlob.
+
+Uses TextBlob's own polarity lexicon (the pattern en-sentiment.xml word
+averages plus its emoticons), compiled once into NumPy arrays. Texts are
+tokenized the way TextBlob's tokenizer does it (contractions split, URLs
+kept whole, faces rejoined), and the batch is scored with array
+operations over all tokens at once, following TextBlob's rules:
+
+- polarity is the mean over known words;
+- a known adverb before a known word scales it by the adverb's intensity
+  and is not counted on its own ("very good"), also across unknown
+  tokens of up to two characters;
+- "no"/"not"/"never" before a known word (also across one-character
+  tokens) flips and halves it ("not good" = -0.35);
+- each "!" boosts the most recent known word by 1.25x.
+
+Tolerance: TextBlob applies these rules with a sequential state machine
+and a few orderings are not reproduced (e.g. "really not good", where the
+negation follows the adverb). On the built-in sample posts, which include
+links and contractions, scores match exactly. On randomized LinkedIn-style
+word soup dense with links, contractions, negations, modifiers and
+emoticons about 99% of labels (same +/-0.1 thresholds) and about 98% of
+polarities (within 0.05) agree. Run `python -m services.sentiment_engine`
+to measure agreement and throughput on the posts in the local database,
+or add --random for the word-soup check.
+"""
+
+import re
+import threading
+
+import numpy as np
+
+_NEGATIONS = ("no", "not", "never")
+_MAX_CACHED_CHUNKS = 100_000
+
+
+def label_for(score: float) -> str:
+    if score > 0.1:
+        return "positive"
+    if score < -0.1:
+        return "negative"
+    return "neutral"
+
+
+class LexiconSentiment:
+    """TextBlob's polarity lexicon compiled to arrays for batch scoring."""
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_sentiment
+        from textblob import _text
+
+        if not dict.__len__(pattern_sentiment):
+            pattern_sentiment.load()
+
+        entries: dict[str, tuple[float, float, bool]] = {}
+        for word in dict.keys(pattern_sentiment):
+            senses = dict.__getitem__(pattern_sentiment, word)
+            if " " in word or None not in senses:
+                continue  # multi-word forms never match whitespace-split tokens
+            polarity, _subjectivity, intensity = senses[None]
+            entries[word] = (float(polarity), float(intensity), "RB" in senses)
+
+        # TextBlob only checks non-alphabetic tokens against its faces, so
+        # "xd" never counts; "(!)" marks sarcasm and adds a neutral assessment
+        emoticons = ["(!)"]
+        entries.setdefault("(!)", (0.0, 1.0, False))
+        for (_mood, polarity), faces in _text.EMOTICONS.items():
+            for face in faces:
+                face = face.lower()
+                if face.isalpha():
+                    continue
+                emoticons.append(face)
+                entries.setdefault(face, (float(polarity), 1.0, False))
+
+        self.index = {word: i for i, word in enumerate(entries)}
+        self.polarity = np.array([e[0] for e in entries.values()] + [0.0])
+        self.intensity = np.array([e[1] for e in entries.values()] + [1.0])
+        self.is_modifier = np.array([e[2] for e in entries.values()] + [False])
+        self.is_face = np.array([w in set(emoticons) for w in entries] + [False])
+        self.unknown = len(entries)  # index of the padding slot for unknown tokens
+
+        # TextBlob's tokenizer (textblob._text.find_tokens), minus sentence
+        # splitting: contractions and quotes are split off ("isn't" -> "is n ' t"),
+        # punctuation is peeled off both ends of each whitespace-separated
+        # chunk (so URLs stay whole), then spaced-out faces are joined again
+        self._contraction_re = re.compile("|".join(re.escape(k) for k in _text.replacements))
+        self._quote_re = re.compile("[\u201c\u201d\u2018\u2019'\"]")
+        self._lead = tuple(_text.PUNCTUATION.replace(".", ""))
+        self._trail = self._lead + (".",)
+        self._replacements = set(_text.replacements)
+        self._abbreviations = _text.ABBREVIATIONS
+        self._abbreviation_res = (_text.RE_ABBR1, _text.RE_ABBR2, _text.RE_ABBR3)
+        self._face_re = _text.RE_EMOTICONS
+        self._sarcasm_re = _text.RE_SARCASM
+        # Chunks like "team," or "good." recur across posts; peel each once
+        self._chunks: dict[str, list[str]] = {}
+
+    def _split_chunk(self, t: str) -> list[str]:
+        """Peel punctuation off a whitespace-separated chunk, as find_tokens does."""
+        tokens, tail = [], []
+        while t.startswith(self._lead) and t not in self._replacements:
+            tokens.append(t[0])
+            t = t[1:]
+        while t.endswith(self._trail) and t not in self._replacements:
+            if t.endswith(self._lead):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith("..."):
+                tail.append("...")
+                t = t[:-3].rstrip(".")
+            if t.endswith("."):
+                if t in self._abbreviations or any(r.match(t) for r in self._abbreviation_res):
+                    break
+                tail.append(".")
+                t = t[:-1]
+        if t:
+            tokens.append(t)
+        tokens.extend(reversed(tail))
+        return tokens
+
+    def tokenize(self, text: str) -> list[str]:
+        """Lowercased tokens of one text, as TextBlob's sentiment sees them."""
+        text = self._contraction_re.sub(r" \g<0>", text or "")
+        text = self._quote_re.sub(r" \g<0> ", text)
+        chunks = self._chunks
+        if len(chunks) > _MAX_CACHED_CHUNKS:
+            chunks.clear()
+        tokens: list[str] = []
+        for chunk in text.split():
+            if chunk.isalnum():
+                tokens.append(chunk)
+                continue
+            split = chunks.get(chunk)
+            if split is None:
+                split = chunks[chunk] = self._split_chunk(chunk)
+            tokens.extend(split)
+        joined = self._sarcasm_re.sub("(!)", " ".join(tokens))
+        joined = self._face_re.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), joined)
+        return joined.lower().split()
+
+    def _tokenize(self, texts: list[str]) -> tuple[list[str], np.ndarray]:
+        tokens: list[str] = []
+        doc_ids: list[int] = []
+        for doc, text in enumerate(texts):
+            found = self.tokenize(text)
+            tokens.extend(found)
+            doc_ids.extend([doc] * len(found))
+        return tokens, np.array(doc_ids, dtype=np.int64)
+
+    def polarity_batch(self, texts: list[str]) -> np.ndarray:
+        """Polarity in [-1, 1] for each text."""
+        n_docs = len(texts)
+        tokens, doc = self._tokenize(texts)
+        if not tokens:
+            return np.zeros(n_docs)
+
+        # Look each distinct token up once
+        uniq, inverse = np.unique(np.array(tokens), return_inverse=True)
+        unknown = self.unknown
+        ids = np.array([self.index.get(t, unknown) for t in uniq], dtype=np.int64)[inverse]
+        known = ids != unknown
+        is_neg = np.isin(uniq, _NEGATIONS)[inverse]
+        is_bang = (uniq == "!")[inverse]
+        length = np.char.str_len(uniq)[inverse]
+        stripped_length = np.char.str_len(np.char.strip(uniq, "'"))[inverse]
+
+        n = len(tokens)
+        positions = np.arange(n)
+
+        def previous(significant):
+            """Index of the nearest earlier significant token in the same post, else -1."""
+            last = np.maximum.accumulate(np.where(significant, positions, -1))
+            prev = np.full(n, -1)
+            prev[1:] = last[:-1]
+            prev[(prev >= 0) & (doc[np.maximum(prev, 0)] != doc)] = -1
+            return prev
+
+        # Negations carry across single-character tokens ("not a good"),
+        # modifiers across unknown tokens of up to two ("really is a good")
+        prev_for_neg = previous(known | (stripped_length > 1))
+        prev_for_mod = previous(known | (length > 2))
+
+        neg_before = (prev_for_neg >= 0) & is_neg[np.maximum(prev_for_neg, 0)]
+
+        # A known adverb before a known word merges into it ("very good")
+        mod_idx = np.maximum(prev_for_mod, 0)
+        face = self.is_face[ids]
+        mod_before = known & ~face & (prev_for_mod >= 0) & known[mod_idx] & self.is_modifier[ids[mod_idx]]
+        consumed = np.zeros(n, dtype=bool)
+        consumed[prev_for_mod[mod_before]] = True
+        assess = known & ~consumed
+
+        # The negation sits before the modifier in "not very good"
+        negated = np.where(mod_before, neg_before[mod_idx], neg_before) & ~face
+        mod_intensity = self.intensity[ids[mod_idx]]
+        mod_intensity = np.where(negated, 1.0 / mod_intensity, mod_intensity)
+        polarity = self.polarity[ids]
+        polarity = np.where(mod_before, np.clip(polarity * mod_intensity, -1.0, 1.0), polarity)
+
+        # Each "!" boosts the most recent assessed word in the same post
+        last_assessed = np.maximum.accumulate(np.where(assess, positions, -1))
+        bang_targets = last_assessed[is_bang]
+        valid = bang_targets >= 0
+        valid[valid] = doc[bang_targets[valid]] == doc[is_bang][valid]
+        boosts = np.bincount(bang_targets[valid], minlength=n)
+        polarity = np.clip(polarity * 1.25 ** boosts, -1.0, 1.0)
+
+        polarity = np.where(negated, polarity * -0.5, polarity)
+
+        sums = np.bincount(doc[assess], weights=polarity[assess], minlength=n_docs)
+        counts = np.bincount(doc[assess], minlength=n_docs)
+        return sums / np.maximum(counts, 1)
+
+    def score_batch(self, texts: list[str]) -> list[tuple[float, str]]:
+        return [(float(p), label_for(p)) for p in self.polarity_batch(texts)]
+
+
+_scorer: LexiconSentiment | None = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer() -> LexiconSentiment:
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = LexiconSentiment()
+        return _scorer
+
+
+_SAMPLE_POSTS = [
+    "Thrilled to announce I've joined an amazing team! Excited for what's next.",
+    "Not a good week. Layoffs hit our team hard and it's really sad.",
+    "We are hiring senior backend engineers in Berlin. Apply via the link below.",
+    "This is not very good advice, honestly. Terrible take.",
+    "Great panel today :) thanks to everyone who came!",
+    "Quarterly results are out. Revenue grew 12% year over year.",
+    "I never expected such a warm welcome. Truly grateful!!",
+    "Bad management is the number one reason people quit.",
+    "Here are 5 lessons I learned building a startup from scratch.",
+    "Disappointed by the conference organization, but the talks were excellent.",
+    "Check out our new report https://lnkd.in/e3Xq9Zp great read for founders :/",
+    "It isn't good enough. We can't ship this, and I don't think we should.",
+    "We're thrilled! Here's the recording: https://www.youtube.com/watch?v=abc123 (link in comments)",
+    "Honestly, it wasn't a bad quarter... we'll see what's next :)",
+]
+
+# Vocabulary for the randomized agreement check (--random)
+_RANDOM_WORDS = (
+    "great good bad terrible amazing excited happy sad proud grateful disappointed "
+    "very really extremely quite not never no team hiring growth product launch "
+    "results week year people leaders engineers customers market data startup "
+    "is was are we our the a an to of and but with for in this that it I"
+).split()
+_RANDOM_EXTRAS = [
+    "isn't", "can't", "don't", "won't", "it's", "we're", "I'm", "didn't", "wasn't", "you'll",
+    "https://lnkd.in/abc", "https://www.linkedin.com/posts/jane_growth-activity-7251234567890123456",
+    "www.example.com/report.", "#hiring", "@jane", ":)", ":(", ":/", ";)", ":D", "!", "!!", "...",
+    "(!)", "e.g.", "Mr.", "U.S.", "10x", "well-known", "\"great\"", "(amazing)",
+]
+
+
+def _random_posts(n: int, seed: int = 0) -> list[str]:
+    """LinkedIn-style word soup dense with links, contractions, negations,
+    modifiers, emoticons and punctuation."""
+    import random
+
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n):
+        words = [
+            rng.choice(_RANDOM_EXTRAS) if rng.random() < 0.25 else rng.choice(_RANDOM_WORDS)
+            for _ in range(rng.randint(5, 40))
+        ]
+        posts.append(" ".join(words) + rng.choice([".", "!", "", " :)"]))
+    return posts
+
+
+if __name__ == "__main__":
+    # Accuracy/throughput vs TextBlob: python -m services.sentiment_engine [--random] [n_posts]
+    import sys
+    import time
+
+    from textblob import TextBlob
+
+    args = [a for a in sys.argv[1:] if a != "--random"]
+    n = int(args[0]) if args else 2000
+    texts: list[str] = []
+    source = "random posts"
+    if "--random" in sys.argv:
+        texts = _random_posts(n)
+    else:
+        source = "database"
+        try:
+            from database import SessionLocal
+            from models import Post
+
+            db = SessionLocal()
+            try:
+                texts = [c for (c,) in db.query(Post.content).filter(Post.content.isnot(None)).limit(n)]
+            finally:
+                db.close()
+        except Exception:
+            pass
+    if not texts:
+        source = "built-in samples"
+        texts = [_SAMPLE_POSTS[i % len(_SAMPLE_POSTS)] for i in range(n)]
+
+    started = time.perf_counter()
+    reference = [TextBlob(t).sentiment.polarity for t in texts]
+    textblob_s = time.perf_counter() - started
+
+    scorer = get_scorer()
+    started = time.perf_counter()
+    scores = scorer.polarity_batch(texts)
+    batch_s = time.perf_counter() - started
+
+    ref = np.array(reference)
+    label_agree = np.mean([label_for(a) == label_for(b) for a, b in zip(ref, scores)])
+    close = np.mean(np.abs(ref - scores) <= 0.05)
+    print(f"{len(texts)} posts ({source})  textblob: {textblob_s:.3f}s  batch: {batch_s:.3f}s  "
+          f"speedup: {textblob_s / batch_s:.1f}x")
+    print(f"label agreement: {label_agree:.1%}  |polarity diff| <= 0.05: {close:.1%}  "
+          f"mean abs diff: {np.mean(np.abs(ref - scores)):.4f}")
@@ -0,0 +1,291 @@
+"""
+Corpus-level TF-IDF topic extraction.
+
+Document frequencies are kept for the whole post corpus in a fixed-size
+hashed table (terms are bucketed by CRC32), updated as new posts are
+analyzed and persisted to DATA_DIR. A batch of posts is tokenized once
+into a sparse term-count matrix and scored against the corpus IDF in one
+pass, so a term's weight reflects how distinctive it is across all posts
+rather than within a single post.
+
+Each web worker process learns into its own copy of the table. save()
+merges only what was learned since the last save into the file under a
+file lock, so processes don't overwrite each other's counts. A missing or
+empty table is first built from the posts already analyzed.
+"""
+
+import os
+import time
+import zlib
+import logging
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = os.path.join(DATA_DIR, "topic_df.npz")
+N_BUCKETS = 2 ** 20
+
+
+class TopicEngine:
+    """Hashed document-frequency table plus batch TF-IDF scoring."""
+
+    def __init__(self, path: str = MODEL_FILE, n_buckets: int = N_BUCKETS):
+        self.path = path
+        self.n_buckets = n_buckets
+        # Same tokenization the per-post TfidfVectorizer used
+        self._analyze = CountVectorizer(stop_words="english", ngram_range=(1, 2)).build_analyzer()
+        self._lock = threading.Lock()
+        self.df = np.zeros(n_buckets, dtype=np.int32)
+        self.n_docs = 0
+        # Learned since the last save; merged into the file by save()
+        self._new_df = np.zeros(n_buckets, dtype=np.int32)
+        self._new_docs = 0
+        self._saved_at = time.monotonic()
+        loaded = self._read()
+        if loaded:
+            self.df, self.n_docs = loaded
+
+    def _read(self) -> tuple[np.ndarray, int] | None:
+        if not os.path.isfile(self.path):
+            return None
+        try:
+            with np.load(self.path) as data:
+                if data["df"].shape == self.df.shape:
+                    return data["df"].astype(np.int32), int(data["n_docs"])
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"Could not load topic model from {self.path}, starting empty")
+        return None
+
+    def _write(self, df: np.ndarray, n_docs: int):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp.npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, df=df, n_docs=n_docs)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _file_lock(self):
+        """Exclusive lock shared with the other web worker processes."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f = open(self.path + ".lock", "a")
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        return f  # closing the file releases the lock
+
+    def save(self):
+        """Merge what was learned since the last save into the file, and pick
+        up what other processes merged meanwhile."""
+        with self._lock:
+            new_df, new_docs = self._new_df, self._new_docs
+            self._new_df = np.zeros(self.n_buckets, dtype=np.int32)
+            self._new_docs = 0
+            self._saved_at = time.monotonic()
+        try:
+            with self._file_lock():
+                stored = self._read()
+                df, n_docs = stored if stored else (np.zeros(self.n_buckets, dtype=np.int32), 0)
+                df += new_df
+                n_docs += new_docs
+                self._write(df, n_docs)
+        except BaseException:
+            # Keep the counts for the next save
+            with self._lock:
+                self._new_df += new_df
+                self._new_docs += new_docs
+            raise
+        with self._lock:
+            self.df = df + self._new_df
+            self.n_docs = n_docs + self._new_docs
+
+    def save_if_due(self, interval: float = 60.0):
+        """save() if anything was learned and the last save is older than `interval` seconds."""
+        with self._lock:
+            due = self._new_docs and time.monotonic() - self._saved_at >= interval
+        if due:
+            self.save()
+
+    def bootstrap(self, db):
+        """Build the table from posts already analyzed if it is empty.
+
+        Posts analyzed before the table existed are never learned again, so
+        without this n_docs stays 0 on existing installs. Posts not analyzed
+        yet are left out; they are learned when analyzed.
+        """
+        from config import SCAN_CHUNK
+        from db_chunks import iter_keyset
+        from models import Post
+
+        if self.n_docs:
+            return
+        with self._file_lock():
+            stored = self._read()
+            if stored and stored[1]:
+                with self._lock:
+                    self.df = stored[0] + self._new_df
+                    self.n_docs = stored[1] + self._new_docs
+                return
+
+            df = np.zeros(self.n_buckets, dtype=np.int32)
+            n_docs = 0
+            analyzed = db.query(Post.id, Post.content).filter(
+                Post.sentiment.isnot(None), Post.content.isnot(None)
+            )
+            for rows in iter_keyset(analyzed, Post.id, SCAN_CHUNK):
+                for row in rows:
+                    buckets = np.unique(np.fromiter(
+                        (self._bucket(t) for t in self._analyze(row.content)), dtype=np.int64
+                    ))
+                    df[buckets] += 1
+                n_docs += len(rows)
+            self._write(df, n_docs)
+        with self._lock:
+            self.df = df + self._new_df
+            self.n_docs = n_docs + self._new_docs
+        logger.info(f"Built topic document frequencies from {n_docs} analyzed posts")
+
+    def _bucket(self, term: str) -> int:
+        return zlib.crc32(term.encode("utf-8")) % self.n_buckets
+
+    def extract_topics_batch(
+        self,
+        texts: list[str],
+        n: int = 5,
+        learn: list[bool] | bool = True,
+    ) -> list[list[str]]:
+        """Top-n TF-IDF terms for each text.
+
+        `learn` marks which texts are new to the corpus and should be added
+        to the document frequencies (pass False for re-analysis of posts
+        that were already counted).
+        """
+        if not texts:
+            return []
+        if isinstance(learn, bool):
+            learn = [learn] * len(texts)
+
+        # Tokenize once into a batch-local vocabulary
+        vocab: dict[str, int] = {}
+        indptr = [0]
+        indices: list[int] = []
+        for text in texts:
+            for term in self._analyze(text or ""):
+                indices.append(vocab.setdefault(term, len(vocab)))
+            indptr.append(len(indices))
+        if not vocab:
+            return [[] for _ in texts]
+
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), indices, indptr),
+            shape=(len(texts), len(vocab)),
+        )
+        counts.sum_duplicates()
+
+        terms = np.array(list(vocab), dtype=object)
+        buckets = np.fromiter((self._bucket(t) for t in terms), dtype=np.int64, count=len(terms))
+
+        learn_rows = np.flatnonzero(np.asarray(learn, dtype=bool))
+        with self._lock:
+            if len(learn_rows):
+                presence = (counts[learn_rows] > 0).sum(axis=0).A1.astype(np.int32)
+                np.add.at(self.df, buckets, presence)
+                np.add.at(self._new_df, buckets, presence)
+                self.n_docs += len(learn_rows)
+                self._new_docs += len(learn_rows)
+            n_docs = max(self.n_docs, 1)
+            df = self.df[buckets]
+
+        # Smoothed IDF, as in sklearn's TfidfTransformer
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        scores = counts.multiply(idf).tocsr()
+
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            if start == end:
+                results.append([])
+                continue
+            row_scores = scores.data[start:end]
+            row_terms = scores.indices[start:end]
+            k = min(n, end - start)
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            results.append([terms[row_terms[i]] for i in top if row_scores[i] > 0])
+        return results
+
+
+_engine: TopicEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TopicEngine:
+    """Shared engine; built from the posts table if nothing was persisted yet."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            engine = TopicEngine()
+            if not engine.n_docs:
+                from database import SessionLocal
+
+                db = SessionLocal()
+                try:
+                    engine.bootstrap(db)
+                finally:
+                    db.close()
+            _engine = engine
+        return _engine
+
+
+def _legacy_extract_topics(text: str, n: int = 5) -> list[str]:
+    """Previous per-post extraction (fresh TfidfVectorizer over the post's sentences),
+    kept for the benchmark below."""
+    import re
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    sentences = [s.strip() for s in re.split(r'[.!?\n]+', text) if len(s.strip()) > 10]
+    if not sentences:
+        return []
+    vectorizer = TfidfVectorizer(max_features=50, stop_words='english', ngram_range=(1, 2), min_df=1)
+    tfidf = vectorizer.fit_transform(sentences)
+    feature_names = vectorizer.get_feature_names_out()
+    scores = tfidf.sum(axis=0).A1
+    top_indices = scores.argsort()[-n:][::-1]
+    return [feature_names[i] for i in top_indices if scores[i] > 0]
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m services.topic_engine [n_posts]
+    import sys
+    import random
+    import timeit
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(0)
+    words = ("ai data hiring growth leadership product launch team remote startup cloud "
+             "security model customer revenue market strategy design engineering culture").split()
+    posts = [
+        ". ".join(" ".join(rng.choices(words, k=12)) for _ in range(rng.randint(2, 8)))
+        for _ in range(n)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = TopicEngine(path=os.path.join(tmp, "df.npz"))
+        legacy = timeit.timeit(lambda: [_legacy_extract_topics(p) for p in posts], number=1)
+        batch = timeit.timeit(lambda: engine.extract_topics_batch(posts), number=1)
+    print(f"{n} posts  per-post: {legacy:.3f}s  batch: {batch:.3f}s  speedup: {legacy / batch:.1f}x")
@@ -0,0 +1,119 @@
+"""
+LinkedIn session cookies for Selenium scrapes.
+
+- Netscape cookie files are parsed once and cached until the file changes.
+- Cookies are injected in a single DevTools call before the first navigation.
+- After a credential login the session cookies are saved to disk, so later
+  jobs for the same account can skip the login form.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_DIR = os.path.join(DATA_DIR, "sessions")
+
+_cache: dict[str, tuple[float, list[dict]]] = {}
+_cache_lock = threading.Lock()
+
+_HTTPONLY_PREFIX = "#HttpOnly_"
+
+
+def parse_cookie_file(path: str) -> list[dict]:
+    """Parse a Netscape-format cookies.txt into DevTools cookie dicts (cached by mtime)."""
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    cookies = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            http_only = line.startswith(_HTTPONLY_PREFIX)
+            if http_only:
+                line = line[len(_HTTPONLY_PREFIX):]
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) != 7:
+                continue
+            domain, _flag, cookie_path, secure, expiration, name, value = fields
+            cookie = {
+                "name": name,
+                "value": value,
+                "domain": domain,
+                "path": cookie_path,
+                "secure": secure.upper() == "TRUE",
+                "httpOnly": http_only,
+            }
+            if expiration.isdigit() and int(expiration) > 0:
+                cookie["expires"] = int(expiration)
+            cookies.append(cookie)
+
+    with _cache_lock:
+        _cache[path] = (mtime, cookies)
+    return cookies
+
+
+def inject_cookies(browser, cookies: list[dict]):
+    """Set all cookies in one DevTools call; works before any page is loaded."""
+    browser.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+
+def session_file(email: str) -> str:
+    digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:16]
+    return os.path.join(SESSIONS_DIR, f"{digest}.txt")
+
+
+def load_saved_session(email: str) -> list[dict] | None:
+    path = session_file(email)
+    if not os.path.isfile(path):
+        return None
+    try:
+        return parse_cookie_file(path) or None
+    except OSError:
+        return None
+
+
+def save_session(browser, email: str):
+    """Write the browser's LinkedIn cookies to the account's session file."""
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    cookies = browser.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    lines = ["# Netscape HTTP Cookie File"]
+    for c in cookies:
+        domain = c.get("domain", "")
+        if "linkedin.com" not in domain:
+            continue
+        prefix = _HTTPONLY_PREFIX if c.get("httpOnly") else ""
+        expires = int(c["expires"]) if c.get("expires", -1) > 0 else 0
+        lines.append("\t".join([
+            prefix + domain,
+            "TRUE" if domain.startswith(".") else "FALSE",
+            c.get("path", "/"),
+            "TRUE" if c.get("secure") else "FALSE",
+            str(expires),
+            c.get("name", ""),
+            c.get("value", ""),
+        ]))
+
+    path = session_file(email)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+    logger.info("Saved LinkedIn session cookies after credential login")
+
+
+def forget_session(email: str):
+    """Drop a saved session that no longer logs in."""
+    try:
+        os.remove(session_file(email))
+    except FileNotFoundError:
+        pass
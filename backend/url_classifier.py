@@ -0,0 +1,145 @@
+"""
+Classifier for LinkedIn result URLs — decides which URLs are actual user posts.
+
+The rules are plain substring matches so that the same rules can be run
+in Python (on each DuckDuckGo hit) and in SQL as LIKE clauses (startup
+junk purge). Each rule group is compiled into a single regex alternation.
+"""
+
+import re
+
+# Allowed URL patterns — only actual user content
+POST_URL_PATTERNS = [
+    "/posts/",       # linkedin.com/posts/username_...
+    "/pulse/",       # linkedin.com/pulse/article-title
+    "/feed/update/", # linkedin.com/feed/update/urn:li:activity:...
+]
+
+BLOCKED_DOMAINS = [
+    "business.linkedin.com",
+    "training.linkedin.com",
+    "training.talent.linkedin.com",
+    "news.linkedin.com",
+    "engineering.linkedin.com",
+    "learning.linkedin.com",
+    "ads.linkedin.com",
+    "developer.linkedin.com",
+]
+
+BLOCKED_PATHS = [
+    "/advice/", "/help/", "/legal/",
+    "/jobs/", "/company/", "/school/", "/events/",
+    "/groups/", "/learning/", "/showcase/", "/newsletters/",
+]
+
+# Paths that make an /in/ URL a piece of content rather than a bare profile
+_PROFILE_CONTENT_PATHS = ["/posts/", "/activity/", "/pulse/"]
+
+# Reason codes returned by classify()
+VALID = "valid"
+BLOCKED_DOMAIN = "blocked_domain"
+BLOCKED_PATH = "blocked_path"
+QUERY_ONLY = "query_only"
+PROFILE_ONLY = "profile_only"
+NOT_A_POST = "not_a_post"
+
+
+def _alternation(needles: list[str]) -> re.Pattern:
+    return re.compile("|".join(re.escape(n) for n in needles))
+
+
+class PostUrlClassifier:
+    """Compiled post-URL rules with single and batch classification."""
+
+    def __init__(
+        self,
+        post_patterns: list[str] = POST_URL_PATTERNS,
+        blocked_domains: list[str] = BLOCKED_DOMAINS,
+        blocked_paths: list[str] = BLOCKED_PATHS,
+    ):
+        self.blocked_domains = list(blocked_domains)
+        self.blocked_paths = list(blocked_paths)
+        self._post_re = _alternation(post_patterns)
+        self._domain_re = _alternation(blocked_domains)
+        self._path_re = _alternation(blocked_paths)
+        self._profile_content_re = _alternation(_PROFILE_CONTENT_PATHS)
+        # Query-string-only URLs (no meaningful path after the domain)
+        self._query_only_re = re.compile(r"linkedin\.com/?\?")
+
+    def classify(self, url: str) -> str:
+        """Return a reason code; VALID means the URL is a user post or article."""
+        if not url:
+            return NOT_A_POST
+        if self._domain_re.search(url):
+            return BLOCKED_DOMAIN
+        if self._path_re.search(url):
+            return BLOCKED_PATH
+        if self._query_only_re.search(url):
+            return QUERY_ONLY
+        if "/in/" in url and not self._profile_content_re.search(url):
+            return PROFILE_ONLY
+        if not self._post_re.search(url):
+            return NOT_A_POST
+        return VALID
+
+    def classify_many(self, urls: list[str]) -> list[str]:
+        """Classify a batch of URLs. Returns reason codes in input order."""
+        classify = self.classify
+        return [classify(url) for url in urls]
+
+    def is_valid(self, url: str) -> bool:
+        return self.classify(url) == VALID
+
+    def sql_junk_patterns(self) -> list[str]:
+        """LIKE patterns matching URLs the blocked-domain/path rules reject."""
+        return [f"%{needle}%" for needle in self.blocked_domains + self.blocked_paths]
+
+
+classifier = PostUrlClassifier()
+
+
+def _legacy_is_valid(url: str) -> bool:
+    """scraper._is_valid_post_url as it was before this module, kept for the
+    benchmark below. It reads the shared rule lists, which only add
+    training.talent.linkedin.com (moved here from the startup purge)."""
+    if any(domain in url for domain in BLOCKED_DOMAINS):
+        return False
+    if any(path in url for path in BLOCKED_PATHS):
+        return False
+    # Block query-string-only URLs (no meaningful path after domain)
+    if re.search(r'linkedin\.com/?\?', url):
+        return False
+    # Block /in/ profile-only URLs (without /posts/ or /activity/)
+    if "/in/" in url and not any(p in url for p in ["/posts/", "/activity/", "/pulse/"]):
+        return False
+    return any(pattern in url for pattern in POST_URL_PATTERNS)
+
+
+if __name__ == "__main__":
+    # Microbenchmark: python url_classifier.py [n_urls]
+    import sys
+    import random
+    import timeit
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    samples = [
+        "https://www.linkedin.com/posts/jane-doe_ai-activity-7211111111111111111-abcd",
+        "https://www.linkedin.com/pulse/some-article-title-john-smith",
+        "https://www.linkedin.com/feed/update/urn:li:activity:7211111111111111111/",
+        "https://www.linkedin.com/in/jane-doe",
+        "https://www.linkedin.com/jobs/view/123456",
+        "https://business.linkedin.com/marketing-solutions",
+        "https://www.linkedin.com/?trk=guest_homepage",
+        "https://www.linkedin.com/company/acme/posts/",
+        "https://example.com/posts/not-linkedin",
+    ]
+    rng = random.Random(0)
+    urls = [rng.choice(samples) + f"?n={i}" * (i % 2) for i in range(n)]
+
+    mismatches = sum(
+        1 for u in urls if classifier.is_valid(u) != _legacy_is_valid(u)
+    )
+    legacy = timeit.timeit(lambda: [_legacy_is_valid(u) for u in urls], number=1)
+    compiled = timeit.timeit(lambda: classifier.classify_many(urls), number=1)
+    print(f"{n} URLs  legacy: {legacy:.3f}s  compiled: {compiled:.3f}s  "
+          f"speedup: {legacy / compiled:.1f}x  mismatches: {mismatches}")
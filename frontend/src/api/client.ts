@@ -1,7 +1,7 @@
 import type {
   PostsResponse, ScrapeJob, AnalyticsOverview, AuthorStats,
   TopicFrequency, EngagementPoint, SentimentData, HashtagData,
-  Collection, Bookmark, SavedSearch, MonitorResult,
+  EnrichProgress, Collection, Bookmark, SavedSearch, MonitorResult,
 } from '../types'
 
 const BASE = '/api'
@@ -137,12 +137,18 @@ export async function getHashtagFrequency(limit = 30): Promise<HashtagData[]> {
   return res.json()
 }
 
-export async function enrichPosts(): Promise<{ enriched: number }> {
+export async function enrichPosts(): Promise<EnrichProgress> {
   const res = await fetch(`${BASE}/analytics/enrich`, { method: 'POST' })
   if (!res.ok) throw new Error('Failed to enrich posts')
   return res.json()
 }
 
+export async function getEnrichStatus(): Promise<EnrichProgress> {
+  const res = await fetch(`${BASE}/analytics/enrich/status`)
+  if (!res.ok) throw new Error('Failed to fetch enrichment status')
+  return res.json()
+}
+
 // Collections
 export async function getCollections(): Promise<Collection[]> {
   const res = await fetch(`${BASE}/collections`)
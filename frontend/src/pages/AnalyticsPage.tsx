@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import {
   AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer,
   PieChart, Pie, Cell, BarChart, Bar,
@@ -6,11 +6,11 @@ import {
 import {
   getAnalyticsOverview, getTopAuthors, getTrendingTopics,
   getEngagementTimeline, getSentimentDistribution, getHashtagFrequency,
-  enrichPosts,
+  enrichPosts, getEnrichStatus,
 } from '../api/client'
 import type {
   AnalyticsOverview, AuthorStats, TopicFrequency,
-  EngagementPoint, SentimentData, HashtagData,
+  EngagementPoint, SentimentData, HashtagData, EnrichProgress,
 } from '../types'
 import { StatCardSkeleton } from '../components/Skeleton'
 import { useToast } from '../components/Toast'
@@ -31,6 +31,8 @@ export default function AnalyticsPage() {
   const [sentiment, setSentiment] = useState<SentimentData[]>([])
   const [hashtags, setHashtags] = useState<HashtagData[]>([])
   const [enriching, setEnriching] = useState(false)
+  const [progress, setProgress] = useState<EnrichProgress | null>(null)
+  const intervalRef = useRef<number | null>(null)
 
   const loadAll = () => {
     setLoading(true)
@@ -58,15 +60,45 @@ export default function AnalyticsPage() {
     loadAll()
   }, [])
 
+  useEffect(() => {
+    return () => {
+      if (intervalRef.current) clearInterval(intervalRef.current)
+    }
+  }, [])
+
+  const pollEnrich = () => {
+    if (intervalRef.current) clearInterval(intervalRef.current)
+    intervalRef.current = window.setInterval(async () => {
+      try {
+        const status = await getEnrichStatus()
+        setProgress(status)
+
+        if (status.status !== 'running') {
+          clearInterval(intervalRef.current!)
+          intervalRef.current = null
+          setEnriching(false)
+          if (status.status === 'completed') {
+            toast.success(`Enriched ${status.enriched} posts`)
+            loadAll()
+          } else if (status.status === 'failed') {
+            toast.error(status.error || 'Failed to enrich posts')
+          }
+        }
+      } catch {
+        clearInterval(intervalRef.current!)
+        intervalRef.current = null
+        setEnriching(false)
+      }
+    }, 2000)
+  }
+
   const handleEnrich = async () => {
     setEnriching(true)
     try {
-      const result = await enrichPosts()
-      toast.success(`Enriched ${result.enriched} posts`)
-      loadAll()
+      setProgress(await enrichPosts())
+      pollEnrich()
     } catch {
       toast.error('Failed to enrich posts')
-    } finally {
       setEnriching(false)
     }
   }
@@ -80,7 +112,11 @@ export default function AnalyticsPage() {
           disabled={enriching}
           className="text-sm px-4 py-2 bg-blue-600 hover:bg-blue-700 disabled:bg-gray-600 rounded-lg text-white transition-colors"
         >
-          {enriching ? 'Enriching...' : 'Re-analyze Posts'}
+          {enriching
+            ? progress && progress.total > 0
+              ? `Enriching ${progress.processed}/${progress.total}...`
+              : 'Enriching...'
+            : 'Re-analyze Posts'}
         </button>
       </div>
 
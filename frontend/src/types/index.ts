@@ -70,6 +70,16 @@ export interface HashtagData {
   count: number
 }
 
+export interface EnrichProgress {
+  status: 'idle' | 'running' | 'completed' | 'failed'
+  total: number
+  processed: number
+  enriched: number
+  started_at: string | null
+  finished_at: string | null
+  error: string | null
+}
+
 export interface Collection {
   id: number
   name: string